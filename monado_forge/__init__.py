@@ -1,6 +1,8 @@
-import bpy
-
-from bpy.types import AddonPreferences
+try:
+	import bpy
+	from bpy.types import AddonPreferences
+except ImportError: # texture decoding worker processes (see utils.parse_textures) only need texture_funcs, and run outside of Blender
+	bpy = None
 
 bl_info = {
 	"name": "Monado Forge",
@@ -23,7 +25,8 @@ packageList = (
 				"modify_ui",
 				)
 
-register, unregister = bpy.utils.register_submodule_factory(__package__, packageList)
+if bpy:
+	register, unregister = bpy.utils.register_submodule_factory(__package__, packageList)
 
 if __name__ == "__main__":
 	register()
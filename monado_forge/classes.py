@@ -143,7 +143,7 @@ class MonadoForgeWimdoMaterial:
 			raise TypeError("expected an int, not a(n) "+str(type(x)))
 		self._extraDataIndex = x
 
-class MonadoForgeTexture: # 2D only, no 3D texture support (for now?)
+class MonadoForgeTexture: # 2D only (3D textures and cube maps come in as a stack of 2D images, see decode_texture)
 	def __init__(self):
 		self._name = "Texture"
 		self._repeating = [False,False] # False = clamp, True = repeat (default False because "weird solid colour" is easier to see as a potential mistake than "minor cross-edge bleeding")
@@ -178,6 +178,78 @@ class MonadoForgeTexture: # 2D only, no 3D texture support (for now?)
 			raise TypeError("expected a bool, not a(n) "+str(type(x)))
 		self._isFiltered = x
 
+# everything decode_texture needs besides the texture itself (see texture_funcs)
+class MonadoForgeTextureDecodeOptions:
+	def __init__(self):
+		self._blueBC5 = False # assume BC5 is a normal map and calculate blue
+		self._depth = 1 # only >1 for 3D textures
+		self._threadCount = 1
+		self._maxSize = 0 # in pixels, for the bigger of the two dimensions (0 = no limit)
+		self._mipLevel = 0 # which level to decode (0 = full size)
+		self._mipCount = 1 # how many levels the data actually has
+		self._layerCount = 1 # only >1 for cube maps (see lbim_layer_count)
+	
+	def isBlueBC5(self):
+		return self._blueBC5
+	def setBlueBC5(self,x):
+		if not isinstance(x,bool):
+			raise TypeError("expected a bool, not a(n) "+str(type(x)))
+		self._blueBC5 = x
+	
+	def getDepth(self):
+		return self._depth
+	def setDepth(self,x):
+		if not isinstance(x,int):
+			raise TypeError("expected an int, not a(n) "+str(type(x)))
+		if x < 1:
+			raise ValueError("depth must be at least 1, not "+str(x))
+		self._depth = x
+	
+	def getThreadCount(self):
+		return self._threadCount
+	def setThreadCount(self,x):
+		if not isinstance(x,int):
+			raise TypeError("expected an int, not a(n) "+str(type(x)))
+		if x < 1:
+			raise ValueError("thread count must be at least 1, not "+str(x))
+		self._threadCount = x
+	
+	def getMaxSize(self):
+		return self._maxSize
+	def setMaxSize(self,x):
+		if not isinstance(x,int):
+			raise TypeError("expected an int, not a(n) "+str(type(x)))
+		if x < 0:
+			raise ValueError("max size can't be negative, not "+str(x))
+		self._maxSize = x
+	
+	def getMipLevel(self):
+		return self._mipLevel
+	def setMipLevel(self,x):
+		if not isinstance(x,int):
+			raise TypeError("expected an int, not a(n) "+str(type(x)))
+		if x < 0:
+			raise ValueError("mip level can't be negative, not "+str(x))
+		self._mipLevel = x
+	
+	def getMipCount(self):
+		return self._mipCount
+	def setMipCount(self,x):
+		if not isinstance(x,int):
+			raise TypeError("expected an int, not a(n) "+str(type(x)))
+		if x < 1:
+			raise ValueError("mip count must be at least 1, not "+str(x))
+		self._mipCount = x
+	
+	def getLayerCount(self):
+		return self._layerCount
+	def setLayerCount(self,x):
+		if not isinstance(x,int):
+			raise TypeError("expected an int, not a(n) "+str(type(x)))
+		if x < 1:
+			raise ValueError("layer count must be at least 1, not "+str(x))
+		self._layerCount = x
+
 class MonadoForgeMaterial:
 	def __init__(self,i):
 		self._index = i
@@ -423,7 +423,12 @@ def extract_wismt_subfile(f, headerOffset, headless=False):
 		raise ValueError("subfile "+subfileName+" did not decompress to its claimed size: "+str(len(content))+" != "+str(subfileSize))
 	return subfileName,content
 
-def import_wismt(f, wimdoResults, context):
+# whether a texture's high-res data (double the size of the medium-res one) would make any difference once it's capped to maxSize
+def high_res_needed(imgWidth,imgHeight,maxSize):
+	return maxSize <= 0 or capped_size(imgWidth*2,imgHeight*2,maxSize) != capped_size(imgWidth,imgHeight,maxSize)
+
+# if texturesOnly, just the textures are read (not decoded), and the list of texture jobs is returned rather than any results
+def import_wismt(f, wimdoResults, context, texturesOnly=False):
 	filename = os.path.splitext(os.path.basename(f.name))[0]
 	game = context.scene.monado_forge_main.game
 	printProgress = context.scene.monado_forge_main.printProgress
@@ -432,6 +437,14 @@ def import_wismt(f, wimdoResults, context):
 		texPath = bpy.path.abspath(context.scene.monado_forge_import.texturePath)
 	differentiate = context.scene.monado_forge_import.differentiateTextures
 	splitTemps = context.scene.monado_forge_import.splitTemps
+	progressive = context.scene.monado_forge_import.progressiveTextures # if so, lower resolutions get imported as stand-ins for the higher ones, which replace them later
+	dds = bool(texPath) and context.scene.monado_forge_import.ddsTextures # if so, lower resolutions are needed as the higher ones' mips
+	if texturesOnly: # only the best of each is wanted
+		progressive = False
+		dds = False
+	keepAllResolutions = context.scene.monado_forge_import.keepAllResolutions
+	maxSize = context.scene.monado_forge_import.maxTextureSize # if so, the medium-res version might be all that's needed
+	skipTextures = context.scene.monado_forge_import.skipMaterialImport and not texturesOnly
 	listOfCachedTextureNames = [] # only needed for XC3 but no harm in building it regardless
 	# little endian assumed
 	# renamed some stuff from older programs to make more sense:
@@ -473,12 +486,12 @@ def import_wismt(f, wimdoResults, context):
 			hasContentType[contentType] = True
 			contentPointers.append([internalOffset,contentSize,highResSubfileIndex,contentType])
 	textureIDList = []
-	if textureIDsOffset > 0 and not context.scene.monado_forge_import.skipMaterialImport:
+	if textureIDsOffset > 0 and not skipTextures:
 		f.seek(mainOffset+textureIDsOffset)
 		for i in range(textureIDsCount):
 			textureIDList.append(readAndParseInt(f,2))
 	textureHeaders = []
-	if textureCountOffset > 0 and not context.scene.monado_forge_import.skipMaterialImport:
+	if textureCountOffset > 0 and not skipTextures:
 		f.seek(mainOffset+textureCountOffset)
 		textureCount = readAndParseInt(f,4)
 		textureChunkSize = readAndParseInt(f,4)
@@ -502,6 +515,9 @@ def import_wismt(f, wimdoResults, context):
 				textureIDList.append(readAndParseInt(f,2))
 	
 	textureAlignment = {} # dict of {internal texture name : final name of image as it is in the Blender file}
+	# textures get collected up and then decoded all together at the end, since that can be done in parallel
+	textureJobs = []
+	textureJobNames = [] # the internal name for each job, for textureAlignment
 	
 	meshes = []
 	vertexWeights = []
@@ -514,7 +530,7 @@ def import_wismt(f, wimdoResults, context):
 		subfileName,subfileData = extract_wismt_subfile(f,subfileHeaderOffset)
 		for cp in contentPointers:
 			internalOffset,contentSize,highResSubfileIndex,contentType = cp
-			if contentType == 0: # model
+			if contentType == 0 and not texturesOnly: # model
 				data = subfileData[internalOffset:internalOffset+contentSize]
 				if printProgress:
 					print("Opening model subfile.")
@@ -788,44 +804,35 @@ def import_wismt(f, wimdoResults, context):
 				if printProgress:
 					print("Found shader chunk of size "+str(contentSize)+" (not supported, skipping)")
 				pass
-			if contentType == 2 and not context.scene.monado_forge_import.skipMaterialImport: # cached texture
+			if contentType == 2 and not skipTextures: # cached texture
 				data = subfileData[internalOffset:internalOffset+contentSize]
 				sf = io.BytesIO(data)
 				try: # no except, just finally (to close sf)
 					for i in range(len(textureHeaders)):
 						textureFilesize,textureOffset,textureNameOffset,textureName = textureHeaders[i]
 						# for some reason, this stuff is in reverse order: first data, then properties (in reverse order), and magic at end
-						sf.seek(textureOffset+textureFilesize-0x4)
-						submagic = sf.read(4)
-						if submagic != b"LBIM":
+						sf.seek(textureOffset)
+						textureData = sf.read(textureFilesize)
+						footer = read_lbim_footer(textureData)
+						if footer is None:
 							print_error("Bad cached texture (invalid subfilemagic); skipping "+str(textureName))
 						else:
-							sf.seek(textureOffset+textureFilesize-0x28)
-							subfileUnknown5 = readAndParseInt(sf,4)
-							subfileUnknown4 = readAndParseInt(sf,4)
-							imgWidth = readAndParseInt(sf,4)
-							imgHeight = readAndParseInt(sf,4)
-							subfileUnknown3 = readAndParseInt(sf,4)
-							subfileUnknown2 = readAndParseInt(sf,4)
-							imgType = readAndParseInt(sf,4)
-							subfileUnknown1 = readAndParseInt(sf,4)
-							imgVersion = readAndParseInt(sf,4)
-							sf.seek(textureOffset)
+							imgDataSize,imgAlignment,imgWidth,imgHeight,imgDepth,imgViewDimension,imgType,imgMipCount,imgVersion = footer # imgDepth is only >1 for 3D textures, imgViewDimension is 1 = 2D, 2 = 3D, 8 = cube
 							listOfCachedTextureNames.append(textureName)
 							dc = splitTemps and textureName.startswith("temp")
 							nameToUse = textureName
 							if differentiate:
 								nameToUse = filename+"_"+nameToUse
-							if context.scene.monado_forge_import.keepAllResolutions:
+							if keepAllResolutions:
 								nameToUse = os.path.join("res0",nameToUse)
-							finalName = parse_texture(nameToUse,imgVersion,imgType,imgWidth,imgHeight,sf.read(textureFilesize),context.scene.monado_forge_import.blueBC5,printProgress,saveTo=texPath,dechannelise=dc)
-							textureAlignment[textureName] = finalName
+							textureJobs.append([nameToUse,imgType,imgWidth,imgHeight,textureData,dc,imgDepth,imgMipCount,lbim_layer_count(imgViewDimension)])
+							textureJobNames.append(textureName)
 				finally:
 					sf.close()
 		del subfileData # just to ensure it's cleaned up as soon as possible
 		nextSubfileIndex += 1
 	# reminder: XC3 doesn't go in here at all (at least for most models)
-	if hasUncachedTexSubfile and context.scene.monado_forge_import.importUncachedTextures and not context.scene.monado_forge_import.skipMaterialImport:
+	if hasUncachedTexSubfile and context.scene.monado_forge_import.importUncachedTextures and not skipTextures:
 		subfileHeaderOffset = mainOffset+subfileHeadersOffset+nextSubfileIndex*3*4
 		subfileName,subfileData = extract_wismt_subfile(f,subfileHeaderOffset)
 		for cpi,cp in enumerate(contentPointers):
@@ -836,42 +843,33 @@ def import_wismt(f, wimdoResults, context):
 				try: # no except, just finally (to close sf)
 					textureName = textureHeaders[textureIDList[cpi-3]][3]
 					# for some reason, this stuff is in reverse order: first data, then properties (in reverse order), and magic at end
-					sf.seek(contentSize-0x4)
-					submagic = sf.read(4)
-					if submagic != b"LBIM":
+					footer = read_lbim_footer(data)
+					if footer is None:
 						print_error("Bad uncached texture (invalid subfilemagic); skipping "+str(textureName))
 					else:
-						sf.seek(contentSize-0x28)
-						subfileUnknown5 = readAndParseInt(sf,4)
-						subfileUnknown4 = readAndParseInt(sf,4)
-						imgWidth = readAndParseInt(sf,4)
-						imgHeight = readAndParseInt(sf,4)
-						subfileUnknown3 = readAndParseInt(sf,4)
-						subfileUnknown2 = readAndParseInt(sf,4)
-						imgType = readAndParseInt(sf,4)
-						subfileUnknown1 = readAndParseInt(sf,4)
-						imgVersion = readAndParseInt(sf,4)
+						imgDataSize,imgAlignment,imgWidth,imgHeight,imgDepth,imgViewDimension,imgType,imgMipCount,imgVersion = footer # imgDepth is only >1 for 3D textures, imgViewDimension is 1 = 2D, 2 = 3D, 8 = cube
 						dc = splitTemps and textureName.startswith("temp")
-						if context.scene.monado_forge_import.keepAllResolutions or highResSubfileIndex <= 0: # if there's no highResSubfileIndex, this is the best resolution
+						useH = highResSubfileIndex > 0 and (keepAllResolutions or high_res_needed(imgWidth,imgHeight,maxSize)) # no point decompressing it just to shrink it back down
+						if keepAllResolutions or progressive or dds or maxSize > 0 or not useH: # if there's no high-res version (or it isn't wanted), this is the best resolution
 							sf.seek(0)
 							nameToUse = textureName
 							if differentiate:
 								nameToUse = filename+"_"+nameToUse
-							if context.scene.monado_forge_import.keepAllResolutions:
+							if keepAllResolutions:
 								nameToUse = os.path.join("res1",nameToUse)
-							finalName = parse_texture(nameToUse,imgVersion,imgType,imgWidth,imgHeight,sf.read(),context.scene.monado_forge_import.blueBC5,printProgress,saveTo=texPath,dechannelise=dc)
-							textureAlignment[textureName] = finalName
+							textureJobs.append([nameToUse,imgType,imgWidth,imgHeight,sf.read(),dc,imgDepth,imgMipCount,lbim_layer_count(imgViewDimension)])
+							textureJobNames.append(textureName)
 						# it is at this point where we need the data from the highest-resolution image
-						if highResSubfileIndex > 0:
+						if useH:
 							hdfileHeaderOffset = mainOffset+subfileHeadersOffset+highResSubfileIndex*3*4
 							hdfileName,hdfileData = extract_wismt_subfile(f,hdfileHeaderOffset)
 							nameToUse = textureName
 							if differentiate:
 								nameToUse = filename+"_"+nameToUse
-							if context.scene.monado_forge_import.keepAllResolutions:
+							if keepAllResolutions:
 								nameToUse = os.path.join("res2",nameToUse)
-							finalName = parse_texture(nameToUse,imgVersion,imgType,imgWidth*2,imgHeight*2,hdfileData,context.scene.monado_forge_import.blueBC5,printProgress,saveTo=texPath,dechannelise=dc)
-							textureAlignment[textureName] = finalName
+							textureJobs.append([nameToUse,imgType,imgWidth*2,imgHeight*2,hdfileData,dc,imgDepth,1,lbim_layer_count(imgViewDimension)]) # the high-res data is just the one level
+							textureJobNames.append(textureName)
 				finally:
 					sf.close()
 		del subfileData
@@ -883,7 +881,7 @@ def import_wismt(f, wimdoResults, context):
 	# there's probably a way to reduce the copy-pasted code here, but the necessary differences are subtle
 	texMPath = bpy.path.abspath(context.scene.monado_forge_import.textureRepoMPath)
 	texHPath = bpy.path.abspath(context.scene.monado_forge_import.textureRepoHPath)
-	if game == "XC3" and context.scene.monado_forge_import.importUncachedTextures and not context.scene.monado_forge_import.skipMaterialImport and texMPath and texHPath:
+	if game == "XC3" and context.scene.monado_forge_import.importUncachedTextures and not skipTextures and texMPath and texHPath:
 		for textureName in set(listOfCachedTextureNames):
 			mFilename = os.path.join(texMPath,textureName+".wismt")
 			hFilename = os.path.join(texHPath,textureName+".wismt")
@@ -893,44 +891,46 @@ def import_wismt(f, wimdoResults, context):
 				subfileName,subfileData = extract_wismt_subfile(fM,0,headless=True)
 				sf = io.BytesIO(subfileData)
 				try: # no except, just finally (to close sf)
-					sf.seek(len(subfileData)-0x4)
-					submagic = sf.read(4)
-					if submagic != b"LBIM":
+					footer = read_lbim_footer(subfileData)
+					if footer is None:
 						print_error("Bad uncached texture (invalid subfilemagic); skipping "+str(textureName))
 						continue
-					sf.seek(len(subfileData)-0x28)
-					subfileUnknown5 = readAndParseInt(sf,4)
-					subfileUnknown4 = readAndParseInt(sf,4)
-					imgWidth = readAndParseInt(sf,4)
-					imgHeight = readAndParseInt(sf,4)
-					subfileUnknown3 = readAndParseInt(sf,4)
-					subfileUnknown2 = readAndParseInt(sf,4)
-					imgType = readAndParseInt(sf,4)
-					subfileUnknown1 = readAndParseInt(sf,4)
-					imgVersion = readAndParseInt(sf,4)
+					imgDataSize,imgAlignment,imgWidth,imgHeight,imgDepth,imgViewDimension,imgType,imgMipCount,imgVersion = footer # imgDepth is only >1 for 3D textures, imgViewDimension is 1 = 2D, 2 = 3D, 8 = cube
 					dc = splitTemps and textureName.startswith("temp")
-					if context.scene.monado_forge_import.keepAllResolutions or not hasH: # if there's no hasH, this is the best resolution
+					useH = hasH and (keepAllResolutions or high_res_needed(imgWidth,imgHeight,maxSize)) # no point reading it just to shrink it back down
+					if keepAllResolutions or progressive or dds or maxSize > 0 or not useH: # if there's no high-res version (or it isn't wanted), this is the best resolution
 						sf.seek(0)
 						nameToUse = textureName
 						if differentiate:
 							nameToUse = filename+"_"+nameToUse
-						if context.scene.monado_forge_import.keepAllResolutions:
+						if keepAllResolutions:
 							nameToUse = os.path.join("res1",nameToUse)
-						finalName = parse_texture(nameToUse,imgVersion,imgType,imgWidth,imgHeight,sf.read(),context.scene.monado_forge_import.blueBC5,printProgress,saveTo=texPath,dechannelise=dc)
-						textureAlignment[textureName] = finalName
+						textureJobs.append([nameToUse,imgType,imgWidth,imgHeight,sf.read(),dc,imgDepth,imgMipCount,lbim_layer_count(imgViewDimension)])
+						textureJobNames.append(textureName)
 					# it is at this point where we need the data from the highest-resolution image
-					if hasH:
+					if useH:
 						with open(hFilename,"rb") as fH:
 							hdfileName,hdfileData = extract_wismt_subfile(fH,0,headless=True)
 							nameToUse = textureName
 							if differentiate:
 								nameToUse = filename+"_"+nameToUse
-							if context.scene.monado_forge_import.keepAllResolutions:
+							if keepAllResolutions:
 								nameToUse = os.path.join("res2",nameToUse)
-							finalName = parse_texture(nameToUse,imgVersion,imgType,imgWidth*2,imgHeight*2,hdfileData,context.scene.monado_forge_import.blueBC5,printProgress,saveTo=texPath,dechannelise=dc)
-							textureAlignment[textureName] = finalName
+							textureJobs.append([nameToUse,imgType,imgWidth*2,imgHeight*2,hdfileData,dc,imgDepth,1,lbim_layer_count(imgViewDimension)]) # the high-res data is just the one level
+							textureJobNames.append(textureName)
 				finally:
 					sf.close()
+	if texturesOnly:
+		return textureJobs
+	cachePath = None
+	if context.scene.monado_forge_main.textureCachePath:
+		cachePath = bpy.path.abspath(context.scene.monado_forge_main.textureCachePath)
+	if dds:
+		finalNames = parse_textures_dds(textureJobs,texPath,printProgress,maxSize=maxSize,blueBC5=context.scene.monado_forge_import.blueBC5,workerCount=context.scene.monado_forge_main.textureWorkers,cachePath=cachePath,cacheMaxBytes=context.scene.monado_forge_main.textureCacheSize*1024*1024)
+	else:
+		finalNames = parse_textures(textureJobs,context.scene.monado_forge_import.blueBC5,printProgress,context.scene.monado_forge_main.textureWorkers,saveTo=texPath,cachePath=cachePath,cacheMaxBytes=context.scene.monado_forge_main.textureCacheSize*1024*1024,reuseSaved=context.scene.monado_forge_import.reuseSavedTextures,progressive=progressive,maxSize=maxSize,shareIdentical=context.scene.monado_forge_import.shareIdenticalTextures)
+	for textureName,finalName in zip(textureJobNames,finalNames):
+		textureAlignment[textureName] = finalName
 	
 	# time to ready materials
 	wimdoMaterials = wimdoResults.getMaterials()
@@ -959,7 +959,7 @@ def import_wismt(f, wimdoResults, context):
 			# 0x20 = set UVW to clamped (override)
 			# 0x40 = disable mipmaps
 			# 0x80 = set UVW to repeat (override)
-			# the current code skips the mipmaps and UVW overrides (since we don't support 3D textures yet anyways)
+			# the current code skips the mipmaps and UVW overrides (3D textures only come in as stacks of 2D slices, so there's no W to wrap anyway)
 			uRepeat = (samplerFlags & 0x01) != 0
 			vRepeat = (samplerFlags & 0x02) != 0
 			uMirror = (samplerFlags & 0x04) != 0
@@ -1035,9 +1035,12 @@ def import_wimdo_and_wismt(self, context):
 	
 	with open(absoluteDefsPath, "rb") as f:
 		wimdoResults = import_wimdo(f, context)
-	with open(absoluteDataPath, "rb") as f:
-		wismtResults = import_wismt(f, wimdoResults, context)
-	return realise_results(wismtResults, os.path.splitext(os.path.basename(absoluteDataPath))[0], self, context)
+	try:
+		with open(absoluteDataPath, "rb") as f:
+			wismtResults = import_wismt(f, wimdoResults, context)
+		return realise_results(wismtResults, os.path.splitext(os.path.basename(absoluteDataPath))[0], self, context)
+	finally:
+		wait_for_texture_writes() # texture files are written in the background while the meshes are made, but have to be there before anything tries to show them
 
 def import_sar1_skel_and_wimdo_and_wismt(self, context):
 	absoluteSkelPath = bpy.path.abspath(context.scene.monado_forge_import.skeletonPath)
@@ -1060,9 +1063,48 @@ def import_sar1_skel_and_wimdo_and_wismt(self, context):
 		skelResult = import_sar1_skel_subfile(f, context)
 	with open(absoluteDefsPath, "rb") as f:
 		wimdoResults = import_wimdo(f, context, externalSkeleton=skelResult)
-	with open(absoluteDataPath, "rb") as f:
-		wismtResults = import_wismt(f, wimdoResults, context)
-	return realise_results(wismtResults, os.path.splitext(os.path.basename(absoluteDataPath))[0], self, context)
+	try:
+		with open(absoluteDataPath, "rb") as f:
+			wismtResults = import_wismt(f, wimdoResults, context)
+		return realise_results(wismtResults, os.path.splitext(os.path.basename(absoluteDataPath))[0], self, context)
+	finally:
+		wait_for_texture_writes() # texture files are written in the background while the meshes are made, but have to be there before anything tries to show them
+
+# extracts every texture from every .wismt in a folder (and its subfolders) straight to the texture output path, without importing anything
+# only model .wismts are looked at (XC3 texture repository files are picked up through the models that use them, as with a normal import)
+def extract_wismt_folder_textures(self, context):
+	absoluteFolderPath = bpy.path.abspath(context.scene.monado_forge_import.textureExtractPath)
+	texPath = bpy.path.abspath(context.scene.monado_forge_import.texturePath)
+	printProgress = context.scene.monado_forge_main.printProgress
+	if printProgress:
+		print("Extracting textures from: "+absoluteFolderPath)
+	
+	wismtPaths = []
+	for root,dirs,files in os.walk(absoluteFolderPath):
+		dirs.sort()
+		for fn in sorted(files):
+			if os.path.splitext(fn)[1] == ".wismt":
+				wismtPaths.append(os.path.join(root,fn))
+	if not wismtPaths:
+		self.report({"ERROR"}, "No .wismt files found in folder")
+		return {"CANCELLED"}
+	
+	# files are only read as the workers are ready for more, so the whole folder is never in memory at once
+	def read_texture_jobs():
+		for path in wismtPaths:
+			with open(path, "rb") as f:
+				if f.read(4) != b"DRSM": # not a model (e.g. a texture repository file), nothing to do
+					yield []
+					continue
+				f.seek(0)
+				try:
+					yield import_wismt(f, None, context, texturesOnly=True)
+				except Exception as e: # one bad file shouldn't stop the rest
+					print_error("Couldn't read textures from "+path+" ("+str(e)+")")
+					yield []
+	extractedCount = extract_textures(read_texture_jobs(),len(wismtPaths),texPath,context.scene.monado_forge_import.blueBC5,printProgress,context.scene.monado_forge_main.textureWorkers,maxSize=context.scene.monado_forge_import.maxTextureSize)
+	self.report({"INFO"}, "Extracted "+str(extractedCount)+" texture(s) from "+str(len(wismtPaths))+" file(s)")
+	return {"FINISHED"}
 
 def register():
 	pass
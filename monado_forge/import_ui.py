@@ -189,6 +189,39 @@ class MonadoForgeViewImportCleanupModelOperator(Operator):
 			self.report({"ERROR"}, "Unexpected error; see console")
 			return {"CANCELLED"}
 
+class MonadoForgeViewImportTexturesOperator(Operator):
+	bl_idname = "object.monado_forge_texture_extract_operator"
+	bl_label = "Xenoblade Texture Extract Operator"
+	bl_description = "Extracts every texture from a folder of .wismt files to the texture output path, without importing any models"
+	bl_options = {"REGISTER"}
+	
+	@classmethod
+	def poll(cls, context):
+		return context.scene.monado_forge_import.textureExtractPath
+	
+	def execute(self, context):
+		game = context.scene.monado_forge_main.game
+		# this isn't part of the poll because it's not a trivial check and the fix needs to be more descriptive
+		if not os.path.isdir(bpy.path.abspath(context.scene.monado_forge_import.textureExtractPath)):
+			self.report({"ERROR"}, "Texture extraction folder is not an existing folder")
+			return {"CANCELLED"}
+		if not os.path.isdir(bpy.path.abspath(context.scene.monado_forge_import.texturePath)):
+			self.report({"ERROR"}, "Texture output path is not an existing folder")
+			return {"CANCELLED"}
+		if game == "XC3" and (context.scene.monado_forge_import.importUncachedTextures and
+				not (os.path.isdir(bpy.path.abspath(context.scene.monado_forge_import.textureRepoMPath)) and os.path.isdir(bpy.path.abspath(context.scene.monado_forge_import.textureRepoHPath)))):
+			self.report({"ERROR"}, "Import uncached textures selected, but no texture repositories provided (both are required)")
+			return {"CANCELLED"}
+		try:
+			if game == "XC1" or game == "XCX":
+				self.report({"ERROR"}, "game not yet supported")
+				return {"CANCELLED"}
+			return extract_wismt_folder_textures(self, context)
+		except Exception:
+			traceback.print_exc()
+			self.report({"ERROR"}, "Unexpected error; see console")
+			return {"CANCELLED"}
+
 class MonadoForgeViewImportNodeLibraryOperator(Operator):
 	bl_idname = "object.monado_forge_import_node_library_operator"
 	bl_label = "Xenoblade Import Node From Library Operator"
@@ -261,6 +294,13 @@ class MonadoForgeViewImportProperties(PropertyGroup):
 		maxlen=1024,
 		subtype="FILE_PATH",
 	)
+	textureExtractPath : StringProperty(
+		name="Texture Extraction Folder",
+		description="Folder of .wismt files (including subfolders) to extract all the textures from, without importing any models",
+		default="",
+		maxlen=1024,
+		subtype="FILE_PATH",
+	)
 	importToCursor : BoolProperty(
 		name="Import To Cursor",
 		description="Place the import at the 3D cursor (false: place it at [0,0,0])",
@@ -299,6 +339,16 @@ class MonadoForgeViewImportProperties(PropertyGroup):
 		maxlen=1024,
 		subtype="FILE_PATH",
 	)
+	reuseSavedTextures : BoolProperty(
+		name="Reuse Unchanged Textures",
+		description="If a texture was already auto-saved from exactly the same data, load that file instead of extracting it again",
+		default=False,
+	)
+	ddsTextures : BoolProperty(
+		name="Save as DDS",
+		description="Auto-save textures as DDS files (with mips) without decoding them at all, which is much faster (dechannelising is skipped, and the max size can only pick from the stored mips). BC6H, BC7, float, 3D and cube map textures still get decoded, since Blender can't load them as DDS files",
+		default=False,
+	)
 	skipMaterialImport : BoolProperty(
 		name="Skip Material Import",
 		description="Skips importing textures and materials entirely",
@@ -343,6 +393,11 @@ class MonadoForgeViewImportProperties(PropertyGroup):
 		description="Appends the filename to the start of texture names (so they don't overwrite existing ones)",
 		default=True,
 	)
+	shareIdenticalTextures : BoolProperty(
+		name="Share Identical Textures",
+		description="If a texture has exactly the same data as one already imported this session (e.g. shared between outfits), use the existing image instead of making another, whatever its name (so nothing is saved under the other names)",
+		default=False,
+	)
 	blueBC5 : BoolProperty(
 		name="Normalize BC5s",
 		description="Assume that BC5-format images are normal maps, and calculate the blue channel accordingly",
@@ -350,7 +405,7 @@ class MonadoForgeViewImportProperties(PropertyGroup):
 	)
 	splitTemps : BoolProperty(
 		name="Dechannelise \"temp\" Files",
-		description="(warning: slow, thinking of a better way to implement the feature)\nIf the image is named \"temp0000\" or similar, splits it out into an independent file per channel",
+		description="If the image is named \"temp0000\" or similar, splits it out into an independent greyscale file per channel",
 		default=False,
 	)
 	keepAllResolutions : BoolProperty(
@@ -358,6 +413,18 @@ class MonadoForgeViewImportProperties(PropertyGroup):
 		description="Include all textures, even if there's a larger resolution of the same",
 		default=False,
 	)
+	progressiveTextures : BoolProperty(
+		name="Progressive Textures",
+		description="Import the lower resolutions first so the model is usable straight away, then swap in the highest resolution in the background as it finishes (does nothing if keeping all resolutions)",
+		default=False,
+	)
+	maxTextureSize : IntProperty(
+		name="Max Texture Size",
+		description="Textures bigger than this (in either direction) get shrunk down by halves until they fit, to save memory (0 = no limit)",
+		default=0,
+		min=0,
+		soft_max=4096,
+	)
 	def nodeLibraryCallback(self, context):
 		return (
 			("BasicMetallic","Basic Metallic Shader","Metallic-style PBR shader with inputs tailored for the average Xenoblade model"),
@@ -408,6 +475,12 @@ class OBJECT_PT_MonadoForgeViewImportPanel(Panel):
 		texturePathRow = col.row()
 		texturePathRow.prop(scn.monado_forge_import, "texturePath", text="...to")
 		texturePathRow.enabled = scn.monado_forge_import.autoSaveTextures
+		reuseSavedRow = col.row()
+		reuseSavedRow.prop(scn.monado_forge_import, "reuseSavedTextures")
+		reuseSavedRow.enabled = scn.monado_forge_import.autoSaveTextures
+		ddsRow = col.row()
+		ddsRow.prop(scn.monado_forge_import, "ddsTextures")
+		ddsRow.enabled = scn.monado_forge_import.autoSaveTextures
 		col.prop(scn.monado_forge_import, "skipMaterialImport")
 		col.prop(scn.monado_forge_import, "createDummyShader")
 		col.prop(scn.monado_forge_import, "fixedViewportColour")
@@ -417,6 +490,9 @@ class OBJECT_PT_MonadoForgeViewImportPanel(Panel):
 		col.operator(MonadoForgeViewImportSkeletonOperator.bl_idname, text="Import Skeleton Only", icon="IMPORT")
 		col.operator(MonadoForgeViewImportModelOperator.bl_idname, text="Import Model Only", icon="IMPORT")
 		col.operator(MonadoForgeViewImportModelWithSkeletonOperator.bl_idname, text="Import Model With Skeleton", icon="IMPORT")
+		col.separator()
+		col.prop(scn.monado_forge_import, "textureExtractPath", text="Folder")
+		col.operator(MonadoForgeViewImportTexturesOperator.bl_idname, text="Extract Textures Only", icon="TEXTURE")
 
 class OBJECT_PT_MonadoForgeViewImportSkeletonOptionsPanel(Panel):
 	bl_idname = "OBJECT_PT_MonadoForgeViewImportSkeletonOptionsPanel"
@@ -464,9 +540,14 @@ class OBJECT_PT_MonadoForgeViewImportTextureOptionsPanel(Panel):
 		scn = context.scene
 		col = layout.column(align=True)
 		col.prop(scn.monado_forge_import, "differentiateTextures")
+		col.prop(scn.monado_forge_import, "shareIdenticalTextures")
 		col.prop(scn.monado_forge_import, "blueBC5")
 		col.prop(scn.monado_forge_import, "splitTemps")
 		col.prop(scn.monado_forge_import, "keepAllResolutions")
+		progressiveRow = col.row()
+		progressiveRow.prop(scn.monado_forge_import, "progressiveTextures")
+		progressiveRow.enabled = not scn.monado_forge_import.keepAllResolutions
+		col.prop(scn.monado_forge_import, "maxTextureSize")
 
 class OBJECT_PT_MonadoForgeViewImportCleanupPanel(Panel):
 	bl_idname = "OBJECT_PT_MonadoForgeViewImportCleanupPanel"
@@ -501,6 +582,7 @@ classes = (
 			MonadoForgeViewImportSkeletonOperator,
 			MonadoForgeViewImportModelOperator,
 			MonadoForgeViewImportModelWithSkeletonOperator,
+			MonadoForgeViewImportTexturesOperator,
 			MonadoForgeViewImportCleanupModelOperator,
 			MonadoForgeViewImportNodeLibraryOperator,
 			MonadoForgeViewImportProperties,
@@ -4,7 +4,9 @@ from bpy.props import (
 						BoolProperty,
 						EnumProperty,
 						FloatProperty,
+						IntProperty,
 						PointerProperty,
+						StringProperty,
 						)
 from bpy.types import (
 						Operator,
@@ -58,6 +60,26 @@ class MonadoForgeProperties(PropertyGroup):
 		step=1,
 		unit="ROTATION",
 	)
+	textureWorkers : IntProperty(
+		name="Texture Workers",
+		description="How many processes to decode textures with at once (0 = one per CPU core, 1 = no extra processes)",
+		default=0,
+		min=0,
+		soft_max=16,
+	)
+	textureCachePath : StringProperty(
+		name="Texture Cache Path",
+		description="Folder to keep decoded textures in, so that importing the same ones again is faster (leave blank to not cache)",
+		default="",
+		maxlen=1024,
+		subtype="FILE_PATH",
+	)
+	textureCacheSize : IntProperty(
+		name="Texture Cache Size (MB)",
+		description="Once the texture cache gets bigger than this, the least recently used textures are deleted from it",
+		default=2048,
+		min=0,
+	)
 
 class OBJECT_PT_MonadoForgePanel(Panel):
 	bl_idname = "OBJECT_PT_MonadoForgePanel"
@@ -87,6 +109,9 @@ class OBJECT_PT_MonadoForgeSettingsPanel(Panel):
 		col.prop(scn.monado_forge_main, "printProgress")
 		col.prop(scn.monado_forge_main, "positionEpsilon")
 		col.prop(scn.monado_forge_main, "angleEpsilon")
+		col.prop(scn.monado_forge_main, "textureWorkers")
+		col.prop(scn.monado_forge_main, "textureCachePath")
+		col.prop(scn.monado_forge_main, "textureCacheSize")
 
 classes = (
 			MonadoForgeProperties,
@@ -0,0 +1,990 @@
+import concurrent.futures
+import hashlib
+import numpy
+import os
+import struct
+import threading
+import zlib
+from collections import OrderedDict
+
+from . classes import *
+
+# everything in here is pure numpy (no bpy) so that it can be run in worker processes (or anything else outside of Blender)
+# the main entry point is decode_texture, the rest is the machinery for it
+
+def clamp(value,low,high):
+	return max(low,min(value,high))
+# ceiling division (as opposed to "//" floor division)
+# https://stackoverflow.com/questions/14822184/
+def ceildiv(a,b):
+	return -(a // -b)
+
+# keeps the most recently used arrays, throwing out the oldest ones once the total size goes over maxBytes
+# an array bigger than maxBytes on its own is just handed back without being kept
+# locked so that worker threads can share one
+class ArrayCache():
+	def __init__(self,maxBytes):
+		self.maxBytes = maxBytes
+		self.totalBytes = 0
+		self.entries = OrderedDict()
+		self.lock = threading.Lock()
+	def get(self,key):
+		with self.lock:
+			try:
+				self.entries.move_to_end(key)
+				return self.entries[key]
+			except KeyError:
+				return None
+	def put(self,key,a):
+		a.flags.writeable = False # shared between callers, so nobody gets to modify it
+		with self.lock:
+			if key in self.entries: # someone else got here first
+				return self.entries[key]
+			if a.nbytes > self.maxBytes:
+				return a
+			self.entries[key] = a
+			self.totalBytes += a.nbytes
+			while self.totalBytes > self.maxBytes:
+				oldKey,oldArray = self.entries.popitem(last=False)
+				self.totalBytes -= oldArray.nbytes
+			return a
+
+swizzleCache = ArrayCache(64*1024*1024)
+
+# https://learn.microsoft.com/en-us/windows/win32/api/dxgiformat/ne-dxgiformat-dxgi_format
+# uses the "raw" values taken from the code rather than the ones in the MS enum (we aren't calling any MS code so we don't need it)
+# only contains things we know of (rather than future-proofing with extra entries) since how're we supposed to guess what the raw numbers equate to
+# (it's pretty obvious that 67 = BC2 and 76 = BC6, but those formats are rare anyway)
+# [formatName, bitsPerPixel]
+# https://github.com/PredatorCZ/XenoLib/blob/master/include/xenolib/lbim.hpp
+imageFormats = {
+				1:["R8_UNORM",8],
+				37:["R8G8B8A8_UNORM",32],
+				41:["R16G16B16A16_FLOAT",64],
+				66:["BC1_UNORM",4], # aka DXT1
+				68:["BC3_UNORM",8], # aka DXT5
+				73:["BC4_UNORM",4],
+				75:["BC5_UNORM",8],
+				76:["BC6H_UF16",8], # no raw number known for the signed version (BC6H_SF16), but decode_blocks can handle it
+				77:["BC7_UNORM",8],
+				109:["B8G8R8A8_UNORM",32],
+				}
+# formats with no compression, where every "block" is a single pixel
+uncompressedFormats = ["R8_UNORM","R8G8B8A8_UNORM","R16G16B16A16_FLOAT","B8G8R8A8_UNORM"]
+# formats that decode to half floats rather than 8-bit, and so get saved as EXRs rather than PNGs
+hdrFormats = ["R16G16B16A16_FLOAT","BC6H_UF16","BC6H_SF16"]
+
+# BC7 needs a *lot* of external junk
+# https://registry.khronos.org/DataFormat/specs/1.3/dataformat.1.3.html#bptc_bc7
+# https://github.com/python-pillow/Pillow/blob/main/src/libImaging/BcnDecode.c
+# [subsetCount, partitionBits, rotationBits, indexSelectionBits, colourBits, alphaBits, endpointPBits, sharedPBits, indexBits, index2Bits]
+bc7ModeData = {
+				0:[3, 4, 0, 0, 4, 0, 1, 0, 3, 0],
+				1:[2, 6, 0, 0, 6, 0, 0, 1, 3, 0],
+				2:[3, 6, 0, 0, 5, 0, 0, 0, 2, 0],
+				3:[2, 6, 0, 0, 7, 0, 1, 0, 2, 0],
+				4:[1, 0, 2, 1, 5, 6, 0, 0, 2, 3],
+				5:[1, 0, 2, 0, 7, 8, 0, 0, 2, 2],
+				6:[1, 0, 0, 0, 7, 7, 1, 0, 4, 0],
+				7:[2, 6, 0, 0, 5, 5, 1, 0, 2, 0],
+				}
+bc7Weights = {
+				2:[0, 21, 43, 64],
+				3:[0, 9, 18, 27, 37, 46, 55, 64],
+				4:[0, 4, 9, 13, 17, 21, 26, 30, 34, 38, 43, 47, 51, 55, 60, 64],
+				}
+# bitmaps of which subsets each pixel uses, [row,column] order
+bc7PartitionMaps = {
+					2:[
+						0xcccc, 0x8888, 0xeeee, 0xecc8, 0xc880, 0xfeec, 0xfec8, 0xec80,
+						0xc800, 0xffec, 0xfe80, 0xe800, 0xffe8, 0xff00, 0xfff0, 0xf000,
+						0xf710, 0x008e, 0x7100, 0x08ce, 0x008c, 0x7310, 0x3100, 0x8cce,
+						0x088c, 0x3110, 0x6666, 0x366c, 0x17e8, 0x0ff0, 0x718e, 0x399c,
+						0xaaaa, 0xf0f0, 0x5a5a, 0x33cc, 0x3c3c, 0x55aa, 0x9696, 0xa55a,
+						0x73ce, 0x13c8, 0x324c, 0x3bdc, 0x6996, 0xc33c, 0x9966, 0x0660,
+						0x0272, 0x04e4, 0x4e40, 0x2720, 0xc936, 0x936c, 0x39c6, 0x639c,
+						0x9336, 0x9cc6, 0x817e, 0xe718, 0xccf0, 0x0fcc, 0x7744, 0xee22,
+						],
+					3:[
+						0xaa685050, 0x6a5a5040, 0x5a5a4200, 0x5450a0a8, 0xa5a50000, 0xa0a05050, 0x5555a0a0, 0x5a5a5050,
+						0xaa550000, 0xaa555500, 0xaaaa5500, 0x90909090, 0x94949494, 0xa4a4a4a4, 0xa9a59450, 0x2a0a4250,
+						0xa5945040, 0x0a425054, 0xa5a5a500, 0x55a0a0a0, 0xa8a85454, 0x6a6a4040, 0xa4a45000, 0x1a1a0500,
+						0x0050a4a4, 0xaaa59090, 0x14696914, 0x69691400, 0xa08585a0, 0xaa821414, 0x50a4a450, 0x6a5a0200,
+						0xa9a58000, 0x5090a0a8, 0xa8a09050, 0x24242424, 0x00aa5500, 0x24924924, 0x24499224, 0x50a50a50,
+						0x500aa550, 0xaaaa4444, 0x66660000, 0xa5a0a5a0, 0x50a050a0, 0x69286928, 0x44aaaa44, 0x66666600,
+						0xaa444444, 0x54a854a8, 0x95809580, 0x96969600, 0xa85454a8, 0x80959580, 0xaa141414, 0x96960000,
+						0xaaaa1414, 0xa05050a0, 0xa0a5a5a0, 0x96000000, 0x40804080, 0xa9a8a9a8, 0xaaaaaa44, 0x2a4a5254,
+						],
+					}
+# one index per subset is stored wlith one fewer bit because it is known to be 0 - this is the list of such indexes
+bc7AnchorIndexes = {
+					"1/1":[0]*64,
+					"1/2":[0]*64,
+					"2/2":[
+							15, 15, 15, 15, 15, 15, 15, 15,
+							15, 15, 15, 15, 15, 15, 15, 15,
+							15, 2, 8, 2, 2, 8, 8, 15,
+							2, 8, 2, 2, 8, 8, 2, 2,
+							15, 15, 6, 8, 2, 8, 15, 15,
+							2, 8, 2, 2, 2, 15, 15, 6,
+							6, 2, 6, 8, 15, 15, 2, 2,
+							15, 15, 15, 15, 15, 2, 2, 15
+							],
+					"1/3":[0]*64,
+					"2/3":[
+							3, 3, 15, 15, 8, 3, 15, 15,
+							8, 8, 6, 6, 6, 5, 3, 3,
+							3, 3, 8, 15, 3, 3, 6, 10,
+							5, 8, 8, 6, 8, 5, 15, 15,
+							8, 15, 3, 5, 6, 10, 8, 15,
+							15, 3, 15, 5, 15, 15, 15, 15,
+							3, 15, 5, 5, 5, 8, 5, 10,
+							5, 10, 8, 13, 15, 12, 3, 3
+							],
+					"3/3":[
+							15, 8, 8, 3, 15, 15, 3, 8,
+							15, 15, 15, 15, 15, 15, 15, 8,
+							15, 8, 15, 3, 15, 8, 15, 8,
+							3, 15, 6, 10, 15, 15, 10, 8,
+							15, 3, 15, 10, 10, 8, 9, 10,
+							6, 15, 8, 15, 3, 6, 6, 8,
+							15, 3, 15, 15, 15, 15, 15, 15,
+							15, 15, 15, 15, 3, 15, 15, 8
+							],
+					}
+
+# the tables above, laid out as arrays once at load time, so decoding is just indexing into them by each block's partition pattern
+# they're kept to the smallest types that fit, since every lookup makes a [block,pixel] array of the same type
+# returns [weightTable,subsetTable,indexWidths,indexOffsets]:
+# 	weightTable is [bits,index], padded out to 16 so that it can be looked up all at once
+# 	subsetTable is {subsetCount:[partition,pixel]}, which subset each pixel uses
+# 	indexWidths and indexOffsets are {(subsetCount,bits):[partition,pixel]}, how many bits each pixel's index has (one fewer for the anchors) and where it starts relative to the first index
+def make_bc7_tables():
+	weightTable = numpy.zeros([5,16],dtype=numpy.uint16)
+	for bits,weights in bc7Weights.items():
+		weightTable[bits,0:len(weights)] = weights
+	subsetTable = {}
+	indexWidths = {}
+	indexOffsets = {}
+	pixelOrder = numpy.arange(16)
+	for subsetCount in [1,2,3]:
+		if subsetCount == 1:
+			subsetTable[subsetCount] = numpy.zeros([64,16],dtype=numpy.uint8)
+		else:
+			subsetBits = subsetCount-1 # 1 bit per pixel for two subsets, 2 bits for three
+			subsetTable[subsetCount] = ((numpy.array(bc7PartitionMaps[subsetCount],dtype=numpy.int64)[:,None] >> (pixelOrder*subsetBits)) & ((1 << subsetBits) - 1)).astype(numpy.uint8)
+		isAnchor = numpy.zeros([64,16],dtype=numpy.uint8)
+		for s in range(subsetCount):
+			isAnchor[numpy.arange(64),bc7AnchorIndexes[str(s+1)+"/"+str(subsetCount)]] = 1
+		for bits in bc7Weights.keys():
+			indexWidths[(subsetCount,bits)] = bits - isAnchor
+			indexOffsets[(subsetCount,bits)] = (numpy.cumsum(indexWidths[(subsetCount,bits)],axis=1) - indexWidths[(subsetCount,bits)]).astype(numpy.uint8)
+	return weightTable,subsetTable,indexWidths,indexOffsets
+bc7WeightTable,bc7SubsetTable,bc7IndexWidths,bc7IndexOffsets = make_bc7_tables()
+bc7ModeLookup = numpy.array([8]+[(b & -b).bit_length()-1 for b in range(1,256)]) # by first byte: the mode is the position of the first set bit (8 if there isn't one)
+
+# BC6H is half-float RGB, using BC7's weights and (first 32) two-subset partitions, but with its own modes
+# https://learn.microsoft.com/en-us/windows/win32/direct3d11/bc6h-format
+# keyed by the mode bits (the first 2 bits, or the first 5 if those are 10 or 11), with the MS mode numbers alongside; any other 5-bit mode is reserved
+# [regionCount, transformed, endpointBits, deltaBits, layout]
+# transformed modes store the first endpoint as is and the rest as signed differences from it (deltaBits being [r,g,b]), the rest store every endpoint in full
+# the layout is where the endpoint bits go, in the order they come after the mode bits, in the same notation as the MS docs:
+# w/x are the endpoints of the first region and y/z those of the second, and [a:b] is bits a to b with bit b read first (so some are backwards)
+bc6ModeData = {
+				0b00:[2, True, 10, [5,5,5], "gy[4], by[4], bz[4], rw[9:0], gw[9:0], bw[9:0], rx[4:0], gz[4], gy[3:0], gx[4:0], bz[0], gz[3:0], bx[4:0], bz[1], by[3:0], ry[4:0], bz[2], rz[4:0], bz[3]"], # 1
+				0b01:[2, True, 7, [6,6,6], "gy[5], gz[4], gz[5], rw[6:0], bz[0], bz[1], by[4], gw[6:0], by[5], bz[2], gy[4], bw[6:0], bz[3], bz[5], bz[4], rx[5:0], gy[3:0], gx[5:0], gz[3:0], bx[5:0], by[3:0], ry[5:0], rz[5:0]"], # 2
+				0b00010:[2, True, 11, [5,4,4], "rw[9:0], gw[9:0], bw[9:0], rx[4:0], rw[10], gy[3:0], gx[3:0], gw[10], bz[0], gz[3:0], bx[3:0], bw[10], bz[1], by[3:0], ry[4:0], bz[2], rz[4:0], bz[3]"], # 3
+				0b00110:[2, True, 11, [4,5,4], "rw[9:0], gw[9:0], bw[9:0], rx[3:0], rw[10], gz[4], gy[3:0], gx[4:0], gw[10], gz[3:0], bx[3:0], bw[10], bz[1], by[3:0], ry[3:0], bz[0], bz[2], rz[3:0], gy[4], bz[3]"], # 4
+				0b01010:[2, True, 11, [4,4,5], "rw[9:0], gw[9:0], bw[9:0], rx[3:0], rw[10], by[4], gy[3:0], gx[3:0], gw[10], bz[0], gz[3:0], bx[4:0], bw[10], by[3:0], ry[3:0], bz[1], bz[2], rz[3:0], bz[4], bz[3]"], # 5
+				0b01110:[2, True, 9, [5,5,5], "rw[8:0], by[4], gw[8:0], gy[4], bw[8:0], bz[4], rx[4:0], gz[4], gy[3:0], gx[4:0], bz[0], gz[3:0], bx[4:0], bz[1], by[3:0], ry[4:0], bz[2], rz[4:0], bz[3]"], # 6
+				0b10010:[2, True, 8, [6,5,5], "rw[7:0], gz[4], by[4], gw[7:0], bz[2], gy[4], bw[7:0], bz[3], bz[4], rx[5:0], gy[3:0], gx[4:0], bz[0], gz[3:0], bx[4:0], bz[1], by[3:0], ry[5:0], rz[5:0]"], # 7
+				0b10110:[2, True, 8, [5,6,5], "rw[7:0], bz[0], by[4], gw[7:0], gy[5], gy[4], bw[7:0], gz[5], bz[4], rx[4:0], gz[4], gy[3:0], gx[5:0], gz[3:0], bx[4:0], bz[1], by[3:0], ry[4:0], bz[2], rz[4:0], bz[3]"], # 8
+				0b11010:[2, True, 8, [5,5,6], "rw[7:0], bz[1], by[4], gw[7:0], by[5], gy[4], bw[7:0], bz[5], bz[4], rx[4:0], gz[4], gy[3:0], gx[4:0], bz[0], gz[3:0], bx[5:0], by[3:0], ry[4:0], bz[2], rz[4:0], bz[3]"], # 9
+				0b11110:[2, False, 6, [6,6,6], "rw[5:0], gz[4], bz[0], bz[1], by[4], gw[5:0], gy[5], by[5], bz[2], gy[4], bw[5:0], gz[5], bz[3], bz[5], bz[4], rx[5:0], gy[3:0], gx[5:0], gz[3:0], bx[5:0], by[3:0], ry[5:0], rz[5:0]"], # 10
+				0b00011:[1, False, 10, [10,10,10], "rw[9:0], gw[9:0], bw[9:0], rx[9:0], gx[9:0], bx[9:0]"], # 11
+				0b00111:[1, True, 11, [9,9,9], "rw[9:0], gw[9:0], bw[9:0], rx[8:0], rw[10], gx[8:0], gw[10], bx[8:0], bw[10]"], # 12
+				0b01011:[1, True, 12, [8,8,8], "rw[9:0], gw[9:0], bw[9:0], rx[7:0], rw[10:11], gx[7:0], gw[10:11], bx[7:0], bw[10:11]"], # 13
+				0b01111:[1, True, 16, [4,4,4], "rw[9:0], gw[9:0], bw[9:0], rx[3:0], rw[10:15], gx[3:0], gw[10:15], bx[3:0], bw[10:15]"], # 14
+				}
+
+# turns the layouts above into runs of bits, once at load time: {modeBits:[[position,bitCount,endpoint,channel,shift],...]}
+# backwards fields are split into single bits, so every run can be read straight off
+def make_bc6_tables():
+	fieldTables = {}
+	for modeBits,(regionCount,transformed,endpointBits,deltaBits,layout) in bc6ModeData.items():
+		pos = 2 if modeBits < 2 else 5
+		fields = []
+		for field in layout.split(", "):
+			channel = "rgb".index(field[0])
+			endpoint = "wxyz".index(field[1])
+			bitRange = [int(b) for b in field[3:-1].split(":")]
+			last,first = bitRange if len(bitRange) == 2 else bitRange*2
+			if last >= first:
+				fields.append([pos,last-first+1,endpoint,channel,first])
+			else:
+				for b in range(first,last-1,-1):
+					fields.append([pos+first-b,1,endpoint,channel,b])
+			pos += abs(last-first)+1
+		fieldTables[modeBits] = fields
+	return fieldTables
+bc6FieldTables = make_bc6_tables()
+
+# BCn blocks as laid out in the file, so a whole texture's worth can be viewed at once instead of read field-by-field
+bc1BlockType = numpy.dtype([("endpoint0","<u2"),("endpoint1","<u2"),("indexes","<u4")])
+bc3BlockType = numpy.dtype([("alpha","u1",(8,)),("endpoint0","<u2"),("endpoint1","<u2"),("indexes","<u4")])
+bc4BlockType = numpy.dtype([("value0","u1"),("value1","u1"),("indexes","u1",(6,))])
+
+# everything decodes to 8-bit RGBA (a quarter the size of floats), since that's all the precision the formats have anyway
+def to_unorm8(values): # 0-255 floats, rounded to nearest
+	return numpy.floor(numpy.clip(values,0,255)+0.5).astype(numpy.uint8)
+
+# Tegra block-linear layout, as per tegra_swizzle:
+# a GOB is 64 bytes wide and 8 rows tall (512 bytes), laid out internally in 16-byte chunks
+# GOBs are stacked blockHeight tall (and blockDepth deep for 3D textures) into blocks, which go left-to-right, then top-to-bottom, then slice-by-slice
+# none of this is stored in the LBIM footer, the console just works it out from the dimensions the same way
+gobWidthBytes = 64
+gobHeight = 8
+gobSize = 512
+
+def block_height_mip0(heightInBlocks): # in GOBs
+	heightAndHalf = heightInBlocks + (heightInBlocks // 2)
+	for blockHeight in [16,8,4,2]:
+		if heightAndHalf >= blockHeight*gobHeight:
+			return blockHeight
+	return 1
+def mip_block_height(mipHeightInBlocks,blockHeight):
+	while mipHeightInBlocks <= (blockHeight // 2) * gobHeight and blockHeight > 1:
+		blockHeight //= 2
+	return blockHeight
+def block_depth_mip0(depth):
+	depthAndHalf = depth + (depth // 2)
+	for blockDepth in [16,8,4,2]:
+		if depthAndHalf >= blockDepth:
+			return blockDepth
+	return 1
+def mip_block_depth(mipDepth,blockDepth):
+	while mipDepth <= blockDepth // 2 and blockDepth > 1:
+		blockDepth //= 2
+	return blockDepth
+
+# the byte offset of every block of a surface, as a [depth,height,width] array (all in blocks, rather than pixels)
+# vectorised per-axis, since the x, y, and z parts of the address are independent of one another (and kept apart, the whole address being their sum)
+# returns [offsetZ,offsetY,offsetX]
+def block_linear_offsets(widthInBlocks,heightInBlocks,depth,bytesPerBlock,blockHeight,blockDepth=1):
+	widthInGobs = ceildiv(widthInBlocks*bytesPerBlock,gobWidthBytes)
+	blockBytes = gobSize*blockHeight*blockDepth
+	sliceBytes = ceildiv(heightInBlocks,blockHeight*gobHeight) * widthInGobs * blockBytes
+	x = numpy.arange(widthInBlocks,dtype=numpy.int64) * bytesPerBlock
+	y = numpy.arange(heightInBlocks,dtype=numpy.int64)
+	z = numpy.arange(depth,dtype=numpy.int64)
+	offsetX = (x // gobWidthBytes) * blockBytes + ((x % 64) // 32) * 256 + ((x % 32) // 16) * 32 + (x % 16)
+	offsetY = (y // (blockHeight*gobHeight)) * blockBytes * widthInGobs + ((y % (blockHeight*gobHeight)) // gobHeight) * gobSize + ((y % 8) // 2) * 64 + (y % 2) * 16
+	offsetZ = (z // blockDepth) * sliceBytes + (z % blockDepth) * gobSize * blockHeight
+	return offsetZ,offsetY,offsetX
+
+# how much space a single swizzled mip takes up, padding and all
+def swizzled_mip_size(widthInBlocks,heightInBlocks,depth,bytesPerBlock,blockHeight,blockDepth=1):
+	widthInGobs = ceildiv(widthInBlocks*bytesPerBlock,gobWidthBytes)
+	return ceildiv(heightInBlocks,blockHeight*gobHeight) * widthInGobs * ceildiv(depth,blockDepth) * gobSize*blockHeight*blockDepth
+
+# for each block in destination order (slice, then row, then column), which block of the data it comes from
+def get_swizzle_gather(widthInBlocks,heightInBlocks,depth,bytesPerBlock,blockHeight,blockDepth=1):
+	key = (widthInBlocks,heightInBlocks,depth,bytesPerBlock,blockHeight,blockDepth)
+	gather = swizzleCache.get(key)
+	if gather is None:
+		# every part of the address is a whole number of blocks, so they can be divided down before being added up, and the sum fits in an int32 (half the size of an int64 gather)
+		offsetZ,offsetY,offsetX = [(offsets // bytesPerBlock).astype(numpy.int32) for offsets in block_linear_offsets(widthInBlocks,heightInBlocks,depth,bytesPerBlock,blockHeight,blockDepth)]
+		gather = swizzleCache.put(key,(offsetZ[:,None,None] + offsetY[None,:,None] + offsetX[None,None,:]).reshape(-1))
+	return gather
+
+# the LBIM footer is the last 0x28 bytes of a texture: [imgDataSize,imgAlignment,imgWidth,imgHeight,imgDepth,imgViewDimension,imgType,imgMipCount,imgVersion] followed by the magic
+# returns None if the data doesn't end in one
+def read_lbim_footer(data):
+	if len(data) < 0x28 or bytes(data[-4:]) != b"LBIM":
+		return None
+	return list(struct.unpack_from("<9I",data,len(data)-0x28))
+
+# how big the blocks of a format are: [pixels per side,bytes per block]
+def format_block_info(imgType):
+	imgFormat,bitsPerPixel = imageFormats[imgType]
+	if imgFormat in uncompressedFormats: # blocks are single pixels rather than 4x4
+		return 1,bitsPerPixel // 8
+	return 4,bitsPerPixel*2
+
+# where every mip level lives in the data: [[offset,size,width,height,depth],...] (width/height/depth in pixels)
+# levels are swizzled separately and just follow one another, each with its block height/depth shrunk to suit its own size
+def lbim_mip_levels(imgType,imgWidth,imgHeight,imgDepth=1,mipCount=1):
+	blockSize,bytesPerBlock = format_block_info(imgType)
+	blockHeight = block_height_mip0(ceildiv(imgHeight,blockSize))
+	blockDepth = block_depth_mip0(imgDepth)
+	levels = []
+	offset = 0
+	for level in range(mipCount):
+		mipWidth = max(imgWidth >> level,1)
+		mipHeight = max(imgHeight >> level,1)
+		mipDepth = max(imgDepth >> level,1)
+		mipHeightInBlocks = ceildiv(mipHeight,blockSize)
+		size = swizzled_mip_size(ceildiv(mipWidth,blockSize),mipHeightInBlocks,mipDepth,bytesPerBlock,mip_block_height(mipHeightInBlocks,blockHeight),mip_block_depth(mipDepth,blockDepth))
+		levels.append([offset,size,mipWidth,mipHeight,mipDepth])
+		offset += size
+	return levels
+
+# cube maps are 6 layers (+X, -X, +Y, -Y, +Z, -Z), each a whole texture with its own mips, one after another; anything else is just the one layer
+# imgViewDimension is from the LBIM footer: 1 = 2D, 2 = 3D, 8 = cube
+def lbim_layer_count(imgViewDimension):
+	return 6 if imgViewDimension == 8 else 1
+# how far apart the layers are in the data: all of a layer's mips, padded out to a whole block of GOBs (of level 0)
+def lbim_layer_size(imgType,imgWidth,imgHeight,imgDepth=1,mipCount=1):
+	blockSize,bytesPerBlock = format_block_info(imgType)
+	heightInBlocks = ceildiv(imgHeight,blockSize)
+	blockBytes = gobSize*mip_block_height(heightInBlocks,block_height_mip0(heightInBlocks))
+	lastOffset,lastSize = lbim_mip_levels(imgType,imgWidth,imgHeight,imgDepth,mipCount)[-1][0:2]
+	return ceildiv(lastOffset+lastSize,blockBytes)*blockBytes
+
+# which level decode_texture will actually use: the requested one, or a smaller stored one if there's a max size and the data has one small enough
+def chosen_mip_level(imgWidth,imgHeight,options):
+	mipLevel = options.getMipLevel()
+	maxSize = options.getMaxSize()
+	while maxSize > 0 and max(imgWidth >> mipLevel,imgHeight >> mipLevel) > maxSize and mipLevel+1 < options.getMipCount():
+		mipLevel += 1
+	return mipLevel
+# how many slices that level has (3D textures lose depth with each mip, the same as width and height)
+def chosen_mip_depth(imgWidth,imgHeight,options):
+	return max(options.getDepth() >> chosen_mip_level(imgWidth,imgHeight,options),1)
+
+# one fancy-index turns the raw (swizzled) data into a flat run of blocks in destination order
+# also returns which blocks actually got assigned (unassigned ones are left as zeroes and must be blanked after decoding)
+def deswizzle_blocks(rawData,gather,bytesPerBlock):
+	raw = numpy.frombuffer(rawData,dtype=numpy.uint8)
+	sourceBlocks = raw[:len(raw) // bytesPerBlock * bytesPerBlock].reshape([-1,bytesPerBlock])
+	blockAssigned = (gather >= 0) & (gather < len(sourceBlocks))
+	if blockAssigned.all():
+		return sourceBlocks[gather],blockAssigned
+	blocks = numpy.zeros([len(gather),bytesPerBlock],dtype=numpy.uint8)
+	blocks[blockAssigned] = sourceBlocks[gather[blockAssigned]]
+	return blocks,blockAssigned
+
+# decoded blocks are [block,pixel,channel] with pixels in file order (top row first), and firstRow is the block row they start at
+# this lays them out into pixels, a whole image of [row,column,channel] in Blender order (bottom row first)
+# the padding needed to make it a whole number of blocks is cropped off the bottom and right
+def blocks_to_pixels(blockPixels,pixels,firstRow,blockCountX,blockSize):
+	imgHeight,imgWidth,channels = pixels.shape
+	blockCountY = len(blockPixels) // blockCountX
+	image = blockPixels.reshape([blockCountY,blockCountX,blockSize,blockSize,channels]).transpose([0,2,1,3,4])
+	top = firstRow*blockSize
+	bottom = min(top+blockCountY*blockSize,imgHeight)
+	image = image.reshape([blockCountY*blockSize,blockCountX*blockSize,channels])[0:bottom-top,0:imgWidth]
+	pixels[imgHeight-bottom:imgHeight-top] = image[::-1]
+
+# a BC4 block is two endpoints followed by 16 3-bit indexes - this is also BC3's alpha and both halves of BC5
+# returns [block,pixel] values in 0-255 range (doubles, since the interpolated ones aren't whole numbers)
+def decode_bc4_channel(blocks):
+	blockData = numpy.ascontiguousarray(blocks).view(bc4BlockType).reshape(-1)
+	value0 = blockData["value0"].astype(numpy.float64)[:,None]
+	value1 = blockData["value1"].astype(numpy.float64)[:,None]
+	steps = numpy.arange(6)
+	eightValues = numpy.concatenate([value0,value1,((6-steps)*value0+(steps+1)*value1)/7.0],axis=1)
+	sixValues = numpy.concatenate([value0,value1,((4-steps[:4])*value0+(steps[:4]+1)*value1)/5.0,numpy.zeros_like(value0),numpy.full_like(value0,255.0)],axis=1)
+	palette = numpy.where(value0 > value1,eightValues,sixValues)
+	# the indexes are a 48-bit little-endian int, 3 bits per pixel
+	indexBits = numpy.zeros(len(blockData),dtype=numpy.uint64)
+	for i in range(6):
+		indexBits |= blockData["indexes"][:,i].astype(numpy.uint64) << numpy.uint64(i*8)
+	pixelIndexes = (indexBits[:,None] >> (numpy.arange(16,dtype=numpy.uint64)*numpy.uint64(3))) & numpy.uint64(0b111)
+	return numpy.take_along_axis(palette,pixelIndexes.astype(numpy.uint8),axis=1)
+
+# every BC1/BC3 block at once; the palette is worked out in doubles and only rounded to 8-bit at the end
+def decode_bc1_bc3_blocks(blocks,hasAlpha):
+	blockData = numpy.ascontiguousarray(blocks).view(bc3BlockType if hasAlpha else bc1BlockType).reshape(-1)
+	ones = numpy.ones(len(blockData))
+	endpoint0 = blockData["endpoint0"].astype(numpy.int32)
+	endpoint1 = blockData["endpoint1"].astype(numpy.int32)
+	colour0 = numpy.stack([(endpoint0 >> 11) / 0b11111,((endpoint0 >> 5) & 0b111111) / 0b111111,(endpoint0 & 0b11111) / 0b11111,ones],axis=-1)
+	colour1 = numpy.stack([(endpoint1 >> 11) / 0b11111,((endpoint1 >> 5) & 0b111111) / 0b111111,(endpoint1 & 0b11111) / 0b11111,ones],axis=-1)
+	fourColour = (endpoint0 > endpoint1) | hasAlpha # BC3 is always in four-colour mode
+	colour2 = numpy.where(fourColour[:,None],2/3*colour0+1/3*colour1,1/2*colour0+1/2*colour1)
+	colour3 = numpy.where(fourColour[:,None],1/3*colour0+2/3*colour1,0.0) # binary alpha when not four-colour
+	colour2[:,3] = 1.0
+	colour3[:,3] = fourColour
+	palette = to_unorm8(numpy.stack([colour0,colour1,colour2,colour3],axis=1)*255.0)
+	pixelIndexes = ((blockData["indexes"][:,None] >> (numpy.arange(16,dtype=numpy.uint32)*2)) & 0b11).astype(numpy.uint8)
+	blockPixels = numpy.take_along_axis(palette,pixelIndexes[:,:,None],axis=1)
+	if hasAlpha: # BC3 alpha is just a BC4 block in front of the BC1 one
+		blockPixels[:,:,3] = to_unorm8(decode_bc4_channel(blocks[:,0:8]))
+	return blockPixels
+
+# BC4 is greyscale, BC5 is two BC4s stapled together (red then green)
+# blueBC5 assumes BC5 is a normal map and rebuilds blue so that [r,g,b] has length 1.0
+def decode_bc4_bc5_blocks(blocks,isBC5,blueBC5):
+	reds = decode_bc4_channel(blocks[:,0:8])
+	blockPixels = numpy.full([len(blocks),16,4],255,dtype=numpy.uint8)
+	if not isBC5:
+		blockPixels[:,:,0:3] = to_unorm8(reds)[:,:,None]
+		return blockPixels
+	greens = decode_bc4_channel(blocks[:,8:16])
+	blockPixels[:,:,0] = to_unorm8(reds)
+	blockPixels[:,:,1] = to_unorm8(greens)
+	if blueBC5:
+		r = (reds-128)/128.0
+		g = (greens-128)/128.0
+		blueSquared = 1-r**2-g**2
+		impossible = blueSquared < 0 # r**2+g**2 > 1, the old per-pixel sqrt would've thrown a ValueError here
+		blues = numpy.sqrt(numpy.where(impossible,0.0,blueSquared))/2+0.5
+		blockPixels[:,:,2] = to_unorm8(numpy.where(impossible,0.5,blues)*255.0)
+	else:
+		blockPixels[:,:,2] = 0
+	return blockPixels
+
+# BC7 blocks are a single 128-bit little-endian int read from the lowest bit upwards
+# pos and n can be plain ints or per-block/per-pixel arrays (needed for the index fields, which shift around the anchors)
+def read_bc7_bits(lo,hi,pos,n):
+	pos = numpy.asarray(pos,dtype=numpy.uint64)
+	shift = pos & numpy.uint64(63)
+	carry = numpy.where(shift == 0,numpy.uint64(0),hi << ((numpy.uint64(64) - shift) & numpy.uint64(63)))
+	value = numpy.where(pos < 64,(lo >> shift) | carry,hi >> shift)
+	return value & ((numpy.uint64(1) << numpy.asarray(n,dtype=numpy.uint64)) - numpy.uint64(1))
+
+# decodes every block of a single mode at once, so all the non-index fields sit at the same bit offset in every block
+def decode_bc7_mode_blocks(lo,hi,mode):
+	subsetCount,partitionBits,rotationBits,indexSelectionBits,colourBits,alphaBits,endpointPBits,sharedPBits,indexBits,index2Bits = bc7ModeData[mode]
+	blockCount = len(lo)
+	pos = mode+1 # the mode itself is a run of zeroes then a one
+	zeroes = numpy.zeros(blockCount,dtype=numpy.int32)
+	partitionPattern = zeroes
+	if partitionBits > 0:
+		partitionPattern = read_bc7_bits(lo,hi,pos,partitionBits).astype(numpy.int32)
+		pos += partitionBits
+	rotationPattern = zeroes
+	if rotationBits > 0:
+		rotationPattern = read_bc7_bits(lo,hi,pos,rotationBits).astype(numpy.int32)
+		pos += rotationBits
+	indexSelectionPattern = zeroes
+	if indexSelectionBits > 0:
+		indexSelectionPattern = read_bc7_bits(lo,hi,pos,indexSelectionBits).astype(numpy.int32)
+		pos += indexSelectionBits
+	# endpoints are [block,subset,endpoint,channel], read as all the reds, then all the greens, etc.
+	# everything from here on fits in 16 bits, even the interpolation (64*255+32 at most)
+	endpoints = numpy.zeros([blockCount,subsetCount,2,4],dtype=numpy.uint16)
+	for c,channelBits in enumerate([colourBits,colourBits,colourBits,alphaBits]):
+		if channelBits == 0: continue
+		for s in range(subsetCount):
+			for ep in [0,1]:
+				endpoints[:,s,ep,c] = read_bc7_bits(lo,hi,pos,channelBits)
+				pos += channelBits
+	usedChannels = 4 if alphaBits > 0 else 3
+	if endpointPBits > 0:
+		for s in range(subsetCount):
+			for ep in [0,1]:
+				pBit = read_bc7_bits(lo,hi,pos,1).astype(numpy.uint16)[:,None]
+				endpoints[:,s,ep,0:usedChannels] = (endpoints[:,s,ep,0:usedChannels] << 1) | pBit
+				pos += 1
+	if sharedPBits > 0:
+		for s in range(subsetCount):
+			pBit = read_bc7_bits(lo,hi,pos,1).astype(numpy.uint16)[:,None,None]
+			endpoints[:,s,:,0:usedChannels] = (endpoints[:,s,:,0:usedChannels] << 1) | pBit
+			pos += 1
+	cb = colourBits+endpointPBits+sharedPBits
+	endpoints[:,:,:,0:3] = (endpoints[:,:,:,0:3] << (8 - cb)) | ((endpoints[:,:,:,0:3] << (8 - cb)) >> cb)
+	if alphaBits > 0:
+		ab = alphaBits+endpointPBits+sharedPBits
+		endpoints[:,:,:,3] = (endpoints[:,:,:,3] << (8 - ab)) | ((endpoints[:,:,:,3] << (8 - ab)) >> ab)
+	else:
+		endpoints[:,:,:,3] = 255
+	# which subset each pixel uses, [block,pixel]
+	partitionMap = bc7SubsetTable[subsetCount][partitionPattern]
+	# one pixel per subset has its index stored with one fewer bit, which shifts every index after it
+	indexSets = []
+	for bits in [indexBits,index2Bits]:
+		if bits == 0: continue
+		widths = bc7IndexWidths[(subsetCount,bits)][partitionPattern]
+		offsets = pos + bc7IndexOffsets[(subsetCount,bits)][partitionPattern]
+		indexSets.append(read_bc7_bits(lo[:,None],hi[:,None],offsets,widths).astype(numpy.uint8))
+		pos += 16*bits - subsetCount
+	weightTable = bc7WeightTable
+	if index2Bits > 0: # the index selection swaps which set is for colour and which is for alpha
+		swapped = indexSelectionPattern[:,None] == 1
+		colourWeights = numpy.where(swapped,weightTable[index2Bits][indexSets[1]],weightTable[indexBits][indexSets[0]])
+		alphaWeights = numpy.where(swapped,weightTable[indexBits][indexSets[0]],weightTable[index2Bits][indexSets[1]])
+	else: # alpha (if any) shares the colour indexes
+		colourWeights = weightTable[indexBits][indexSets[0]]
+		alphaWeights = colourWeights
+	pixelEndpoints = numpy.take_along_axis(endpoints,partitionMap[:,:,None,None],axis=1) # [block,pixel,endpoint,channel]
+	weights = numpy.concatenate([numpy.repeat(colourWeights[:,:,None],3,axis=2),alphaWeights[:,:,None]],axis=2)
+	values = ((64-weights)*pixelEndpoints[:,:,0,:]+weights*pixelEndpoints[:,:,1,:]+32) >> 6
+	# rotation swaps alpha with one of the colour channels
+	for rotation in [1,2,3]:
+		rotated = rotationPattern == rotation
+		values[rotated,:,rotation-1],values[rotated,:,3] = values[rotated,:,3],values[rotated,:,rotation-1]
+	return values.astype(numpy.uint8) # always whole numbers in 0-255 already
+
+# classifies every block by mode, then decodes each mode's blocks together
+# mode 8 is reserved (should never happen) and decodes as transparent black, as is da rulez
+def decode_bc7_blocks(blocks):
+	halves = numpy.ascontiguousarray(blocks).view("<u8").reshape([-1,2])
+	lo = halves[:,0]
+	hi = halves[:,1]
+	modes = bc7ModeLookup[blocks[:,0]]
+	blockPixels = numpy.zeros([len(blocks),16,4],dtype=numpy.uint8)
+	for mode in range(8):
+		selected = numpy.nonzero(modes == mode)[0]
+		if len(selected) > 0:
+			blockPixels[selected] = decode_bc7_mode_blocks(lo[selected],hi[selected],mode)
+	return blockPixels,numpy.count_nonzero(modes == 8)
+
+def sign_extend(values,bits):
+	signBit = 1 << (bits-1)
+	return ((values + signBit) & ((1 << bits) - 1)) - signBit
+
+# BC6H endpoints get spread out to the full 16 bits (15 plus sign for signed) before interpolating, so that the maximum stored value becomes the maximum half
+def unquantize_bc6(values,bits,isSigned):
+	if isSigned:
+		if bits >= 16:
+			return values
+		magnitudes = numpy.abs(values)
+		unquantized = numpy.where(magnitudes >= (1 << (bits-1)) - 1,0x7fff,((magnitudes << 15) + 0x4000) >> (bits-1))
+		unquantized[magnitudes == 0] = 0
+		return numpy.where(values < 0,-unquantized,unquantized)
+	if bits >= 15:
+		return values
+	unquantized = numpy.where(values == (1 << bits) - 1,0xffff,((values << 16) + 0x8000) >> bits)
+	unquantized[values == 0] = 0
+	return unquantized
+
+# decodes every BC6H block of a single mode at once, like decode_bc7_mode_blocks
+# returns [block,pixel,channel] half floats, with alpha always 1
+def decode_bc6_mode_blocks(lo,hi,modeBits,isSigned):
+	regionCount,transformed,endpointBits,deltaBits,layout = bc6ModeData[modeBits]
+	blockCount = len(lo)
+	# endpoints are [block,endpoint,channel], in wxyz order (two per region)
+	endpoints = numpy.zeros([blockCount,regionCount*2,3],dtype=numpy.int64)
+	for pos,bitCount,endpoint,channel,shift in bc6FieldTables[modeBits]:
+		endpoints[:,endpoint,channel] |= read_bc7_bits(lo,hi,pos,bitCount).astype(numpy.int64) << shift
+	if isSigned:
+		endpoints[:,0] = sign_extend(endpoints[:,0],endpointBits)
+	if transformed: # the rest are differences from the first, which wrap around
+		for c in range(3):
+			endpoints[:,1:,c] = (endpoints[:,0:1,c] + sign_extend(endpoints[:,1:,c],deltaBits[c])) & ((1 << endpointBits) - 1)
+	if isSigned:
+		endpoints[:,1:] = sign_extend(endpoints[:,1:],endpointBits)
+	endpoints = unquantize_bc6(endpoints,endpointBits,isSigned)
+	# the indexes follow the partition (if there is one), with one fewer bit for each region's anchor, the same as BC7
+	if regionCount == 2:
+		partitionPattern = read_bc7_bits(lo,hi,77,5).astype(numpy.int32)
+		indexBits = 3
+		pos = 82
+	else:
+		partitionPattern = numpy.zeros(blockCount,dtype=numpy.int32)
+		indexBits = 4
+		pos = 65
+	partitionMap = bc7SubsetTable[regionCount][partitionPattern] # [block,pixel]
+	widths = bc7IndexWidths[(regionCount,indexBits)][partitionPattern]
+	offsets = pos + bc7IndexOffsets[(regionCount,indexBits)][partitionPattern]
+	weights = bc7WeightTable[indexBits][read_bc7_bits(lo[:,None],hi[:,None],offsets,widths).astype(numpy.uint8)][:,:,None].astype(numpy.int64)
+	endpoint0 = numpy.take_along_axis(endpoints,(partitionMap*2)[:,:,None],axis=1) # [block,pixel,channel]
+	endpoint1 = numpy.take_along_axis(endpoints,(partitionMap*2+1)[:,:,None],axis=1)
+	values = ((64-weights)*endpoint0+weights*endpoint1+32) >> 6
+	# scaled down to fit the bits of a half (31/32 of the full range, so the biggest value isn't infinity), and sign-and-magnitude if signed
+	if isSigned:
+		magnitudes = (numpy.abs(values)*31) >> 5
+		halfBits = numpy.where(values < 0,magnitudes | 0x8000,magnitudes)
+	else:
+		halfBits = (values*31) >> 6
+	blockPixels = numpy.ones([blockCount,16,4],dtype=numpy.float16)
+	blockPixels[:,:,0:3] = halfBits.astype(numpy.uint16).view(numpy.float16)
+	return blockPixels
+
+# classifies every block by mode, then decodes each mode's blocks together (like decode_bc7_blocks)
+# blocks with a reserved mode decode as opaque black (unlike BC7's mode 8, which is transparent black), but are counted the same way
+def decode_bc6_blocks(blocks,isSigned):
+	halves = numpy.ascontiguousarray(blocks).view("<u8").reshape([-1,2])
+	lo = halves[:,0]
+	hi = halves[:,1]
+	modes = blocks[:,0] & 0b11111
+	modes = numpy.where(modes & 0b11 < 2,modes & 0b11,modes)
+	blockPixels = numpy.zeros([len(blocks),16,4],dtype=numpy.float16)
+	blockPixels[:,:,3] = 1
+	reservedCount = len(blocks)
+	for modeBits in bc6ModeData.keys():
+		selected = numpy.nonzero(modes == modeBits)[0]
+		if len(selected) > 0:
+			blockPixels[selected] = decode_bc6_mode_blocks(lo[selected],hi[selected],modeBits,isSigned)
+			reservedCount -= len(selected)
+	return blockPixels,reservedCount
+
+# references:
+# 	https://www.vg-resource.com/thread-31389.html
+# 	https://www.vg-resource.com/thread-33929.html
+# 	https://github.com/ScanMountGoat/tegra_swizzle
+# 	https://learn.microsoft.com/en-us/windows/win32/direct3d10/d3d10-graphics-programming-guide-resources-block-compression
+# 	https://learn.microsoft.com/en-us/windows/win32/direct3d11/bc6h-format
+# 	https://learn.microsoft.com/en-us/windows/win32/direct3d11/bc7-format
+# 	https://github.com/python-pillow/Pillow/blob/main/src/libImaging/BcnDecode.c
+# 	https://registry.khronos.org/DataFormat/specs/1.3/dataformat.1.3.html#bptc_bc7
+# decodes a batch of deswizzled blocks to [block,pixel,channel] uint8s (a "block" is just one pixel for uncompressed formats), or half floats for hdrFormats
+# Blender always needs alpha, so decoded colours are always length 4
+# mode8Count is how many blocks had a reserved mode (BC7's mode 8, or one of BC6H's)
+def decode_blocks(imgFormat,blocks,blueBC5):
+	mode8Count = 0
+	if imgFormat == "R8G8B8A8_UNORM": # blocks are just the pixels themselves
+		blockPixels = blocks.reshape([-1,1,4])
+	elif imgFormat == "B8G8R8A8_UNORM":
+		blockPixels = blocks[:,[2,1,0,3]].reshape([-1,1,4])
+	elif imgFormat == "R8_UNORM": # greyscale, like BC4
+		blockPixels = numpy.full([len(blocks),1,4],255,dtype=numpy.uint8)
+		blockPixels[:,0,0:3] = blocks
+	elif imgFormat == "R16G16B16A16_FLOAT": # already half floats, so they go straight through (astype makes it a writable copy in native order)
+		blockPixels = numpy.ascontiguousarray(blocks).view("<f2").astype(numpy.float16).reshape([-1,1,4])
+	elif imgFormat == "BC1_UNORM" or imgFormat == "BC3_UNORM": # easy enough to treat these the same
+		blockPixels = decode_bc1_bc3_blocks(blocks,imgFormat == "BC3_UNORM")
+	elif imgFormat == "BC4_UNORM" or imgFormat == "BC5_UNORM":
+		blockPixels = decode_bc4_bc5_blocks(blocks,imgFormat == "BC5_UNORM",blueBC5)
+	elif imgFormat == "BC6H_UF16" or imgFormat == "BC6H_SF16":
+		blockPixels,mode8Count = decode_bc6_blocks(blocks,imgFormat == "BC6H_SF16")
+	elif imgFormat == "BC7_UNORM":
+		blockPixels,mode8Count = decode_bc7_blocks(blocks)
+	else: # imageFormats has something that isn't handled here
+		raise ValueError("no decoder for "+imgFormat)
+	return blockPixels,mode8Count
+
+# bare-bones PNG writer for 8-bit images: [row,column] is greyscale, [row,column,channel] is grey+alpha/RGB/RGBA (top row first, as PNGs go)
+# every row uses the "up" filter (difference from the row above), which is cheap to do all at once and compresses textures well
+# https://www.w3.org/TR/png/
+pngCompressionLevel = 6
+def png_chunk(chunkType,data):
+	return struct.pack(">I",len(data))+chunkType+data+struct.pack(">I",zlib.crc32(chunkType+data))
+def encode_png(pixels):
+	height,width = pixels.shape[0:2]
+	channels = 1 if pixels.ndim == 2 else pixels.shape[2]
+	colourType = {1:0,2:4,3:2,4:6}[channels]
+	rows = pixels.reshape([height,width*channels])
+	filtered = numpy.empty([height,1+width*channels],dtype=numpy.uint8)
+	filtered[:,0] = 2 # up
+	filtered[0,1:] = rows[0]
+	numpy.subtract(rows[1:],rows[:-1],out=filtered[1:,1:]) # wraps around, as it should
+	header = struct.pack(">IIBBBBB",width,height,8,colourType,0,0,0)
+	return b"\x89PNG\r\n\x1a\n"+png_chunk(b"IHDR",header)+png_chunk(b"IDAT",zlib.compress(filtered.tobytes(),pngCompressionLevel))+png_chunk(b"IEND",b"")
+
+# bare-bones OpenEXR writer for half-float images, same shapes as encode_png (top row first, as EXRs go too)
+# no compression, one scanline per chunk, which every reader has to support
+# https://openexr.com/en/latest/OpenEXRFileLayout.html
+exrMagic = b"\x76\x2f\x31\x01"
+def exr_attribute(name,attributeType,data):
+	return name+b"\0"+attributeType+b"\0"+struct.pack("<i",len(data))+data
+def encode_exr(pixels):
+	height,width = pixels.shape[0:2]
+	channels = 1 if pixels.ndim == 2 else pixels.shape[2]
+	channelNames = {1:"Y",3:"RGB",4:"RGBA"}[channels]
+	channelOrder = sorted(range(channels),key=lambda c:channelNames[c]) # has to be alphabetical
+	channelList = b"".join(channelNames[c].encode()+b"\0"+struct.pack("<iB3xii",1,0,1,1) for c in channelOrder)+b"\0" # half, not linear, no subsampling
+	window = struct.pack("<4i",0,0,width-1,height-1)
+	header = exrMagic+struct.pack("<I",2)
+	header += exr_attribute(b"channels",b"chlist",channelList)
+	header += exr_attribute(b"compression",b"compression",b"\0")
+	header += exr_attribute(b"dataWindow",b"box2i",window)
+	header += exr_attribute(b"displayWindow",b"box2i",window)
+	header += exr_attribute(b"lineOrder",b"lineOrder",b"\0") # top row first
+	header += exr_attribute(b"pixelAspectRatio",b"float",struct.pack("<f",1.0))
+	header += exr_attribute(b"screenWindowCenter",b"v2f",struct.pack("<2f",0.0,0.0))
+	header += exr_attribute(b"screenWindowWidth",b"float",struct.pack("<f",1.0))
+	header += b"\0"
+	# each chunk is [row,byteCount], then the row one channel at a time, and the offset table before them says where each one starts
+	rowBytes = width*channels*2
+	chunks = numpy.empty(height,dtype=[("row","<i4"),("byteCount","<i4"),("values","<f2",(channels,width))])
+	chunks["row"] = numpy.arange(height)
+	chunks["byteCount"] = rowBytes
+	chunks["values"] = pixels.reshape([height,width,channels]).transpose([0,2,1])[:,channelOrder]
+	offsets = len(header)+8*height+numpy.arange(height,dtype="<u8")*(8+rowBytes)
+	return header+offsets.tobytes()+chunks.tobytes()
+# just enough of the header to find the size, which is all that's needed from any EXR this module writes
+def exr_size(exrData):
+	pos = 8
+	while exrData[pos] != 0:
+		nameEnd = exrData.index(b"\0",pos)
+		typeEnd = exrData.index(b"\0",nameEnd+1)
+		attributeSize = struct.unpack_from("<i",exrData,typeEnd+1)[0]
+		if exrData[pos:nameEnd] == b"dataWindow":
+			xMin,yMin,xMax,yMax = struct.unpack_from("<4i",exrData,typeEnd+5)
+			return xMax-xMin+1,yMax-yMin+1
+		pos = typeEnd+5+attributeSize
+	raise ValueError("EXR has no dataWindow")
+
+# the file extension for a texture's encoded images (see encode_texture_pngs), from either the format or the data itself
+def texture_file_extension(imgType):
+	return ".exr" if imageFormats[imgType][0] in hdrFormats else ".png"
+def image_file_extension(fileData):
+	return ".exr" if fileData[0:4] == exrMagic else ".png"
+def image_file_size(fileData): # [width,height], straight from the header
+	if fileData[0:4] == exrMagic:
+		return exr_size(fileData)
+	return struct.unpack_from(">II",fileData,16)
+# the PNGs for a decoded texture (in Blender order), top row first: the whole thing, then one greyscale image per channel if dechannelise
+# half-float (HDR) textures get EXRs instead, since PNGs would lose everything outside 0-1
+def encode_texture_pngs(pixels,dechannelise=False):
+	pixels = pixels[::-1]
+	encode = encode_exr if pixels.dtype == numpy.float16 else encode_png
+	pngs = [encode(pixels)]
+	if dechannelise:
+		pngs += [encode(pixels[:,:,i]) for i in range(4)]
+	return pngs
+
+# writes to a temporary file first, so that a half-written file never ends up where a finished one should be
+def write_file_atomically(path,data):
+	os.makedirs(os.path.dirname(path),exist_ok=True)
+	tempPath = path+"."+str(os.getpid())+"_"+str(threading.get_ident())+".tmp" # in case anyone else is writing the same file at the same time
+	with open(tempPath,"wb") as f:
+		f.write(data)
+	os.replace(tempPath,path)
+
+# decodes a texture and saves it as a PNG at savePath (plus a greyscale PNG per channel if dechannelise), all without Blender, so it can be done entirely in a worker process
+# (EXRs rather than PNGs for HDR formats, so savePath should end in texture_file_extension)
+# returns [unassignedCount,blockCount,mode8Count,pixelCount]
+def extract_texture(imgType,imgWidth,imgHeight,rawData,options,savePath,dechannelise=False):
+	pixels,unassignedCount,blockCount,mode8Count,pngs = decode_texture_to_pngs(imgType,imgWidth,imgHeight,rawData,options,dechannelise,keepPixels=False)
+	write_file_atomically(savePath,pngs[0])
+	basePath,extension = os.path.splitext(savePath)
+	for c,pngData in zip(["r","g","b","a"],pngs[1:]):
+		write_file_atomically(basePath+"_"+c+extension,pngData)
+	pngWidth,pngHeight = image_file_size(pngs[0])
+	return [unassignedCount,blockCount,mode8Count,pngWidth*pngHeight]
+
+# DDS output, for when the textures only need to end up on disk: the blocks just get put back in order, with no decoding at all
+# only old-style headers (no DX10 extension), since that's all Blender's DDS loader takes, so the formats without one (BC6H, BC7, float) can't be done this way
+# https://learn.microsoft.com/en-us/windows/win32/direct3ddds/dx-graphics-dds-pguide
+ddsFormats = { # DDS_PIXELFORMAT [flags,FourCC,bit count,R mask,G mask,B mask,A mask]
+	"R8_UNORM":[0x20000,b"",8,0xff,0,0,0], # luminance
+	"R8G8B8A8_UNORM":[0x41,b"",32,0xff,0xff00,0xff0000,0xff000000], # RGB, alpha
+	"B8G8R8A8_UNORM":[0x41,b"",32,0xff0000,0xff00,0xff,0xff000000],
+	"BC1_UNORM":[0x4,b"DXT1",0,0,0,0,0], # FourCC
+	"BC3_UNORM":[0x4,b"DXT5",0,0,0,0,0],
+	"BC4_UNORM":[0x4,b"ATI1",0,0,0,0,0],
+	"BC5_UNORM":[0x4,b"ATI2",0,0,0,0,0],
+}
+# each stored level's blocks, in plain top-to-bottom, left-to-right order (only the first slice of a 3D texture)
+# returns [[levelData,width,height],...] and how many blocks were missing from the data (left as zeroes)
+def deswizzle_mip_levels(imgType,imgWidth,imgHeight,rawData,imgDepth=1,mipCount=1):
+	blockSize,bytesPerBlock = format_block_info(imgType)
+	blockHeight = block_height_mip0(ceildiv(imgHeight,blockSize))
+	blockDepth = block_depth_mip0(imgDepth)
+	levels = []
+	unassignedCount = 0
+	for mipOffset,mipSize,mipWidth,mipHeight,mipDepth in lbim_mip_levels(imgType,imgWidth,imgHeight,imgDepth,mipCount):
+		blockCountX = ceildiv(mipWidth,blockSize)
+		blockCountY = ceildiv(mipHeight,blockSize)
+		gather = get_swizzle_gather(blockCountX,blockCountY,1,bytesPerBlock,mip_block_height(blockCountY,blockHeight),mip_block_depth(mipDepth,blockDepth))
+		blocks,blockAssigned = deswizzle_blocks(memoryview(rawData)[mipOffset:],gather,bytesPerBlock)
+		unassignedCount += numpy.count_nonzero(~blockAssigned)
+		levels.append([blocks.tobytes(),mipWidth,mipHeight])
+	return levels,unassignedCount
+# levels are [[levelData,width,height],...] as from deswizzle_mip_levels, biggest first, each half the size of the one before (imgType has to be one of the ddsFormats)
+def encode_dds(imgType,levels):
+	imgFormat,bitsPerPixel = imageFormats[imgType]
+	imgWidth,imgHeight = levels[0][1:3]
+	flags = 0x1 | 0x2 | 0x4 | 0x1000 # caps, height, width, pixel format
+	caps = 0x1000 # texture
+	if imgFormat in uncompressedFormats:
+		flags |= 0x8 # pitch
+		pitchOrLinearSize = imgWidth*bitsPerPixel // 8
+	else:
+		flags |= 0x80000 # linear size
+		pitchOrLinearSize = len(levels[0][0])
+	if len(levels) > 1:
+		flags |= 0x20000 # mip count
+		caps |= 0x8 | 0x400000 # complex, mipmap
+	pixelFormat = struct.pack("<II4s5I",32,*ddsFormats[imgFormat])
+	header = struct.pack("<7I44x",124,flags,imgHeight,imgWidth,pitchOrLinearSize,0,len(levels))+pixelFormat+struct.pack("<4I4x",caps,0,0,0)
+	return b"DDS "+header+b"".join(level[0] for level in levels)
+
+# on-disk cache of finished textures, so that re-importing the same model doesn't mean decoding (or encoding) everything all over again
+# entries are named after a hash of everything that affects the result (plus whether it's split into channels), and hold the PNGs/EXRs exactly as they'd be saved, which also takes less space than the pixels
+# the least recently used ones get deleted once the folder goes over maxBytes
+decodedCacheVersion = 2 # bump this whenever the decoders change what they output, so that old entries stop matching
+def decoded_texture_cache_key(imgType,imgWidth,imgHeight,rawData,options):
+	hasher = hashlib.blake2b(digest_size=20)
+	hasher.update(struct.pack("<10I",decodedCacheVersion,imgType,imgWidth,imgHeight,options.getDepth(),options.isBlueBC5(),options.getMaxSize(),options.getMipLevel(),options.getMipCount(),options.getLayerCount()))
+	hasher.update(rawData)
+	return hasher.hexdigest()
+# an entry is [magic,blockCount,fileCount] then each file as [byteCount,data], in the same order as encode_texture_pngs
+cacheEntryMagic = b"MFTC"
+cacheEntryExtension = ".mftc"
+def cached_texture_path(cachePath,key,dechannelise=False):
+	return os.path.join(cachePath,key+("_split" if dechannelise else "")+cacheEntryExtension)
+# returns [blockCount,pngs], or None if there's no usable entry
+def load_cached_texture(cachePath,key,dechannelise=False):
+	entryPath = cached_texture_path(cachePath,key,dechannelise)
+	try:
+		with open(entryPath,"rb") as f:
+			entryData = f.read()
+		os.utime(entryPath) # counts as a use, as far as the LRU is concerned
+		magic,blockCount,fileCount = struct.unpack_from("<4sII",entryData,0)
+		pos = 12
+		pngs = []
+		for i in range(fileCount):
+			fileSize = struct.unpack_from("<I",entryData,pos)[0]
+			pngs.append(entryData[pos+4:pos+4+fileSize])
+			pos += 4+fileSize
+	except (OSError,struct.error): # not there, or cut short (which is as good as not there)
+		return None
+	if magic != cacheEntryMagic or pos != len(entryData) or fileCount != (5 if dechannelise else 1):
+		return None
+	return [blockCount,pngs]
+def has_cached_texture(cachePath,key,dechannelise=False): # only a guess (it could still turn out to be unreadable), but without loading anything
+	return os.path.exists(cached_texture_path(cachePath,key,dechannelise))
+def save_cached_texture(cachePath,key,dechannelise,blockCount,pngs,maxBytes):
+	entryData = struct.pack("<4sII",cacheEntryMagic,blockCount,len(pngs))+b"".join(struct.pack("<I",len(pngData))+pngData for pngData in pngs)
+	write_file_atomically(cached_texture_path(cachePath,key,dechannelise),entryData) # so that a half-written file never looks like a real entry
+	trim_texture_cache(cachePath,maxBytes)
+def trim_texture_cache(cachePath,maxBytes):
+	entries = []
+	for entry in os.scandir(cachePath):
+		if entry.name.endswith(".npy"): # decoded pixels, from before entries were the finished files
+			try:
+				os.remove(entry.path)
+			except OSError:
+				pass
+		elif entry.name.endswith(cacheEntryExtension):
+			stat = entry.stat()
+			entries.append([stat.st_mtime,stat.st_size,entry.path])
+	entries.sort() # oldest first
+	totalBytes = sum(e[1] for e in entries)
+	for mtime,size,entryPath in entries:
+		if totalBytes <= maxBytes:
+			break
+		try:
+			os.remove(entryPath)
+		except OSError: # someone else got rid of it already
+			pass
+		totalBytes -= size
+
+# 2x2 box filter for [row,column,channel] uint8 or float16 images (an odd row/column out just gets dropped, like mips do)
+def halve_image(pixels):
+	imgHeight,imgWidth,channels = pixels.shape
+	sumType = numpy.float32 if pixels.dtype == numpy.float16 else numpy.uint16
+	if imgHeight > 1:
+		summed = pixels[0:imgHeight//2*2].reshape([imgHeight//2,2,imgWidth,channels]).sum(axis=1,dtype=sumType)
+	else:
+		summed = pixels.astype(sumType)*2
+	if imgWidth > 1:
+		summed = summed[:,0:imgWidth//2*2].reshape([summed.shape[0],imgWidth//2,2,channels]).sum(axis=2,dtype=sumType)
+	else:
+		summed = summed*2
+	if pixels.dtype == numpy.float16:
+		return (summed/4).astype(numpy.float16)
+	return ((summed+2)//4).astype(numpy.uint8)
+
+# what size an image ends up after being halved until it fits within maxSize
+def capped_size(imgWidth,imgHeight,maxSize):
+	while maxSize > 0 and max(imgWidth,imgHeight) > maxSize:
+		imgWidth = max(imgWidth//2,1)
+		imgHeight = max(imgHeight//2,1)
+	return imgWidth,imgHeight
+
+# textures with fewer block rows than this per thread aren't worth splitting up
+minBandRows = 64
+# the most blocks decoded in one go; the decoders make a lot of [block,pixel] arrays along the way, so this is what keeps a huge texture from needing gigabytes on top of its output
+maxChunkBlocks = 65536
+
+# deswizzles and decodes a whole texture into [row,column,channel] uint8 RGBA (float16 for hdrFormats), in Blender order (bottom row first) and already cropped to size
+# imgWidth/imgHeight are always the full (level 0) size; the options say which mip level to decode, and how many the data has
+# if the options have a max size, the smallest stored level that fits is used, and anything still too big is box-filtered down by halves until it fits (see capped_size)
+# 3D textures and cube maps come out as one tall image, with their slices/faces stacked top to bottom (first at the top), each shrunk separately if need be
+# imgType is the raw format number from the LBIM footer, rawData is the whole (swizzled) data, options is a MonadoForgeTextureDecodeOptions (or None for the defaults)
+def decode_texture(imgType,imgWidth,imgHeight,rawData,options=None):
+	return decode_texture_with_counts(imgType,imgWidth,imgHeight,rawData,options)[0]
+
+# decode_texture_with_counts, plus the texture already encoded by encode_texture_pngs, so that the encoding gets done wherever the decoding is (e.g. a worker process)
+# if not keepPixels, the pixels are left out (as None), for when the PNGs are all that's wanted (no point sending them back from a worker process for nothing)
+# returns [pixels,unassignedCount,blockCount,mode8Count,pngs]
+def decode_texture_to_pngs(imgType,imgWidth,imgHeight,rawData,options=None,dechannelise=False,keepPixels=True):
+	pixels,unassignedCount,blockCount,mode8Count = decode_texture_with_counts(imgType,imgWidth,imgHeight,rawData,options)
+	return [pixels if keepPixels else None,unassignedCount,blockCount,mode8Count,encode_texture_pngs(pixels,dechannelise)]
+
+# decode_texture_to_pngs by way of the texture cache (if there's a cachePath): a hit needs no decoding or encoding at all, and a clean decode gets saved for next time
+# meant for worker processes, so that the cache's disk work happens there too
+# (only clean decodes get cached, so that any warnings still show up every time)
+# returns the same as decode_texture_to_pngs, with the pixels left out
+def decode_texture_to_pngs_cached(imgType,imgWidth,imgHeight,rawData,options=None,dechannelise=False,cachePath=None,cacheKey=None,cacheMaxBytes=0):
+	if cachePath:
+		cached = load_cached_texture(cachePath,cacheKey,dechannelise)
+		if cached is not None:
+			blockCount,pngs = cached
+			return [None,0,blockCount,0,pngs]
+	decoded = decode_texture_to_pngs(imgType,imgWidth,imgHeight,rawData,options,dechannelise,keepPixels=False)
+	pixels,unassignedCount,blockCount,mode8Count,pngs = decoded
+	if cachePath and unassignedCount == 0 and mode8Count == 0:
+		save_cached_texture(cachePath,cacheKey,dechannelise,blockCount,pngs,cacheMaxBytes)
+	return decoded
+
+# same as decode_texture, but also says how things went, since the caller has to do the reporting (this may well be running in another process)
+# big textures can be split into horizontal bands of blocks which are decoded by several threads, all writing into the same output
+# numpy lets go of the GIL for the big array operations, but not for all the small ones between them, so this is only worth it when there are otherwise idle cores (see utils.texture_band_threads)
+# every slice and layer goes through the same gather and decode, as if they were one tall texture, so a stack costs no more setup than a single image
+# returns [pixels,unassignedCount,blockCount,mode8Count]
+def decode_texture_with_counts(imgType,imgWidth,imgHeight,rawData,options=None):
+	if options is None:
+		options = MonadoForgeTextureDecodeOptions()
+	if imgType not in imageFormats:
+		raise ValueError("unknown/unsupported image type (id "+str(imgType)+")")
+	blueBC5 = options.isBlueBC5()
+	imgDepth = options.getDepth()
+	layerCount = options.getLayerCount()
+	threadCount = options.getThreadCount()
+	mipLevel = chosen_mip_level(imgWidth,imgHeight,options)
+	if mipLevel >= options.getMipCount():
+		raise ValueError("mip level "+str(mipLevel)+" requested, but the data only has "+str(options.getMipCount()))
+	imgFormat,bitsPerPixel = imageFormats[imgType]
+	blockSize,unswizzleBufferSize = format_block_info(imgType) # in pixels, and in bytes
+	# since the minimum block size is 4, images must be divisible by 4 - extend them as necessary
+	blockHeight = block_height_mip0(ceildiv(imgHeight,blockSize))
+	blockDepth = block_depth_mip0(imgDepth)
+	layerSize = lbim_layer_size(imgType,imgWidth,imgHeight,imgDepth,options.getMipCount()) if layerCount > 1 else 0
+	mipOffset,mipSize,imgWidth,imgHeight,mipDepth = lbim_mip_levels(imgType,imgWidth,imgHeight,imgDepth,mipLevel+1)[mipLevel]
+	if mipOffset > 0:
+		rawData = memoryview(rawData)[mipOffset:]
+	blockCountX = ceildiv(imgWidth,blockSize)
+	blockCountY = ceildiv(imgHeight,blockSize)
+	imageCount = layerCount*mipDepth # every slice of every layer
+	blockCount = blockCountX*blockCountY*imageCount
+	blockHeight = mip_block_height(blockCountY,blockHeight)
+	blockDepth = mip_block_depth(mipDepth,blockDepth)
+	
+	gather = get_swizzle_gather(blockCountX,blockCountY,mipDepth,unswizzleBufferSize,blockHeight,blockDepth)
+	if layerCount > 1: # every layer is laid out the same, just further along
+		gather = (gather[None,:] + (numpy.arange(layerCount,dtype=numpy.int32)*(layerSize // unswizzleBufferSize))[:,None]).reshape(-1)
+	# in a stack, each image keeps its padding to a whole number of blocks until the end, so that its blocks don't run into the next one's
+	paddedHeight = imgHeight if imageCount == 1 else blockCountY*blockSize
+	rowCount = blockCountY*imageCount
+	pixels = numpy.empty([paddedHeight*imageCount,imgWidth,4],dtype=numpy.float16 if imgFormat in hdrFormats else numpy.uint8)
+	# gather the band's blocks into order, then decode them a chunk of rows at a time (however many threads there are)
+	chunkRows = max(1,maxChunkBlocks // blockCountX)
+	def decode_band(firstRow,lastRow):
+		unassignedCount = 0
+		mode8Count = 0
+		for chunkRow in range(firstRow,lastRow,chunkRows):
+			chunkEnd = min(chunkRow+chunkRows,lastRow)
+			blocks,blockAssigned = deswizzle_blocks(rawData,gather[chunkRow*blockCountX:chunkEnd*blockCountX],unswizzleBufferSize)
+			blockPixels,chunkMode8Count = decode_blocks(imgFormat,blocks,blueBC5)
+			blockPixels[~blockAssigned] = 0
+			blocks_to_pixels(blockPixels,pixels,chunkRow,blockCountX,blockSize)
+			unassignedCount += numpy.count_nonzero(~blockAssigned)
+			mode8Count += chunkMode8Count
+		return unassignedCount,mode8Count
+	bandCount = clamp(threadCount,1,rowCount // minBandRows)
+	if bandCount > 1:
+		bandRows = ceildiv(rowCount,bandCount)
+		with concurrent.futures.ThreadPoolExecutor(max_workers=bandCount) as pool:
+			bandResults = list(pool.map(decode_band,range(0,rowCount,bandRows),[min(r+bandRows,rowCount) for r in range(0,rowCount,bandRows)]))
+	else:
+		bandResults = [decode_band(0,rowCount)]
+	if paddedHeight != imgHeight: # the padding is at the bottom of each image, which comes first in Blender order
+		pixels = pixels.reshape([imageCount,paddedHeight,imgWidth,4])[:,paddedHeight-imgHeight:].reshape([-1,imgWidth,4])
+	# too big, so shrink it down until it fits
+	maxSize = options.getMaxSize()
+	while maxSize > 0 and max(pixels.shape[0] // imageCount,pixels.shape[1]) > maxSize:
+		if imageCount == 1:
+			pixels = halve_image(pixels)
+		else:
+			pixels = numpy.concatenate([halve_image(image) for image in numpy.split(pixels,imageCount)])
+	unassignedCount = sum(r[0] for r in bandResults)
+	mode8Count = sum(r[1] for r in bandResults)
+	return pixels,unassignedCount,blockCount,mode8Count
+#[...]
\ No newline at end of file
@@ -1,13 +1,18 @@
 import bpy
+import concurrent.futures
 import io
 import math
 import mathutils
+import multiprocessing
 import numpy
 import os
 import struct
+import threading
+import time
 from contextlib import redirect_stdout
 
 from . classes import *
+from . texture_funcs import *
 
 # math constants
 
@@ -20,19 +25,6 @@ rad720 = math.radians(720)
 
 def get_bit_from_right(x,b):
 	return x & (1 << b)
-def clamp(value,low,high):
-	return max(low,min(value,high))
-# ceiling division (as opposed to "//" floor division)
-# https://stackoverflow.com/questions/14822184/
-def ceildiv(a,b):
-	return -(a // -b)
-# https://stackoverflow.com/questions/12681945/
-def reverse_int(n,l):
-	result = 0
-	for i in range(l):
-		result = (result << 1) + (n & 1)
-		n >>= 1
-	return result
 # https://stackabuse.com/python-how-to-flatten-list-of-lists/
 def flattened_list(given_list):
 	return [item for sublist in given_list for item in sublist]
@@ -67,8 +59,6 @@ def print_progress_bar(n,d,t): # numerator, denominator, text
 		print_bar(n/d)
 		print(" "+str(n)+" / "+str(d))
 
-swizzleMapCache = {}
-
 # file reading
 
 u8CodeB = ">B"
@@ -131,41 +121,6 @@ def readFixedLenStr(inFile,length):
 		strBytes += c
 	return strBytes.decode("utf-8")
 
-# https://stackoverflow.com/questions/10689748/how-to-read-bits-from-a-file
-# tweaked to operate directly on a bytearray so an extra file-like object isn't needed
-# as normal, 0x30 is read as 0, 0, 1, 1, 0, 0, 0, 0 in 1-bit chunks, and as 0011, 0000 in 4-bit chunks
-# as reversed, 0x30 is read as 0, 0, 0, 0, 1, 1, 0, 0 in 1-bit chunks, but as 0011, 0000 in 4-bit chunks
-# the "why" is simply "because that's how it needs to work" (mostly for BC7 purposes)
-class BitReader():
-	def __init__(self,a,reverse=False):
-		self.input = a
-		self.accumulator = 0
-		self.bcount = 0
-		self.pointer = 0
-		self.reverse = reverse
-	def _readbit(self):
-		if not self.bcount:
-			next = self.input[self.pointer]
-			self.pointer += 1
-			self.accumulator = next
-			self.bcount = 8
-		if self.reverse:
-			rv = (self.accumulator & (1 << 7-(self.bcount-1))) >> 7-(self.bcount-1)
-		else:
-			rv = (self.accumulator & (1 << self.bcount-1)) >> self.bcount-1
-		self.bcount -= 1
-		return rv
-	def readbits(self,n):
-		if n == 0: return None # having to deal with None is better than confusing "read a 0" with "read nothing so here's 0"
-		v = 0
-		d = n
-		while d > 0:
-			v = (v << 1) | self._readbit()
-			d -= 1
-		if self.reverse:
-			return reverse_int(v,n)
-		return v
-
 # Blender helper functions
 
 def flipRoll(roll):
@@ -308,514 +263,570 @@ def cleanup_mesh(context,meshObj,looseVerts,emptyGroups,emptyShapes):
 			meshObj.shape_key_remove(r)
 	context.view_layer.objects.active = tempActive
 
-# https://learn.microsoft.com/en-us/windows/win32/api/dxgiformat/ne-dxgiformat-dxgi_format
-# uses the "raw" values taken from the code rather than the ones in the MS enum (we aren't calling any MS code so we don't need it)
-# only contains things we know of (rather than future-proofing with extra entries) since how're we supposed to guess what the raw numbers equate to
-# (it's pretty obvious that 67 = BC2 and 76 = BC6, but those formats are rare anyway)
-# [formatName, bitsPerPixel]
-# possible additions: 1:R8Unorm, 41:R16G16B16A16Float, 109:B8G8R8A8Unorm, https://github.com/PredatorCZ/XenoLib/blob/master/include/xenolib/lbim.hpp
-imageFormats = {
-				37:["R8G8B8A8_UNORM",32],
-				66:["BC1_UNORM",4], # aka DXT1
-				68:["BC3_UNORM",8], # aka DXT5
-				73:["BC4_UNORM",4],
-				75:["BC5_UNORM",8],
-				77:["BC7_UNORM",8],
-				}
-
-# BC7 needs a *lot* of external junk
-# https://registry.khronos.org/DataFormat/specs/1.3/dataformat.1.3.html#bptc_bc7
-# https://github.com/python-pillow/Pillow/blob/main/src/libImaging/BcnDecode.c
-# [subsetCount, partitionBits, rotationBits, indexSelectionBits, colourBits, alphaBits, endpointPBits, sharedPBits, indexBits, index2Bits]
-bc7ModeData = {
-				0:[3, 4, 0, 0, 4, 0, 1, 0, 3, 0],
-				1:[2, 6, 0, 0, 6, 0, 0, 1, 3, 0],
-				2:[3, 6, 0, 0, 5, 0, 0, 0, 2, 0],
-				3:[2, 6, 0, 0, 7, 0, 1, 0, 2, 0],
-				4:[1, 0, 2, 1, 5, 6, 0, 0, 2, 3],
-				5:[1, 0, 2, 0, 7, 8, 0, 0, 2, 2],
-				6:[1, 0, 0, 0, 7, 7, 1, 0, 4, 0],
-				7:[2, 6, 0, 0, 5, 5, 1, 0, 2, 0],
-				}
-bc7Weights = {
-				2:[0, 21, 43, 64],
-				3:[0, 9, 18, 27, 37, 46, 55, 64],
-				4:[0, 4, 9, 13, 17, 21, 26, 30, 34, 38, 43, 47, 51, 55, 60, 64],
-				}
-# bitmaps of which subsets each pixel uses, [row,column] order
-bc7PartitionMaps = {
-					2:[
-						0xcccc, 0x8888, 0xeeee, 0xecc8, 0xc880, 0xfeec, 0xfec8, 0xec80,
-						0xc800, 0xffec, 0xfe80, 0xe800, 0xffe8, 0xff00, 0xfff0, 0xf000,
-						0xf710, 0x008e, 0x7100, 0x08ce, 0x008c, 0x7310, 0x3100, 0x8cce,
-						0x088c, 0x3110, 0x6666, 0x366c, 0x17e8, 0x0ff0, 0x718e, 0x399c,
-						0xaaaa, 0xf0f0, 0x5a5a, 0x33cc, 0x3c3c, 0x55aa, 0x9696, 0xa55a,
-						0x73ce, 0x13c8, 0x324c, 0x3bdc, 0x6996, 0xc33c, 0x9966, 0x0660,
-						0x0272, 0x04e4, 0x4e40, 0x2720, 0xc936, 0x936c, 0x39c6, 0x639c,
-						0x9336, 0x9cc6, 0x817e, 0xe718, 0xccf0, 0x0fcc, 0x7744, 0xee22,
-						],
-					3:[
-						0xaa685050, 0x6a5a5040, 0x5a5a4200, 0x5450a0a8, 0xa5a50000, 0xa0a05050, 0x5555a0a0, 0x5a5a5050,
-						0xaa550000, 0xaa555500, 0xaaaa5500, 0x90909090, 0x94949494, 0xa4a4a4a4, 0xa9a59450, 0x2a0a4250,
-						0xa5945040, 0x0a425054, 0xa5a5a500, 0x55a0a0a0, 0xa8a85454, 0x6a6a4040, 0xa4a45000, 0x1a1a0500,
-						0x0050a4a4, 0xaaa59090, 0x14696914, 0x69691400, 0xa08585a0, 0xaa821414, 0x50a4a450, 0x6a5a0200,
-						0xa9a58000, 0x5090a0a8, 0xa8a09050, 0x24242424, 0x00aa5500, 0x24924924, 0x24499224, 0x50a50a50,
-						0x500aa550, 0xaaaa4444, 0x66660000, 0xa5a0a5a0, 0x50a050a0, 0x69286928, 0x44aaaa44, 0x66666600,
-						0xaa444444, 0x54a854a8, 0x95809580, 0x96969600, 0xa85454a8, 0x80959580, 0xaa141414, 0x96960000,
-						0xaaaa1414, 0xa05050a0, 0xa0a5a5a0, 0x96000000, 0x40804080, 0xa9a8a9a8, 0xaaaaaa44, 0x2a4a5254,
-						],
-					}
-# one index per subset is stored wlith one fewer bit because it is known to be 0 - this is the list of such indexes
-bc7AnchorIndexes = {
-					"1/1":[0]*64,
-					"1/2":[0]*64,
-					"2/2":[
-							15, 15, 15, 15, 15, 15, 15, 15,
-							15, 15, 15, 15, 15, 15, 15, 15,
-							15, 2, 8, 2, 2, 8, 8, 15,
-							2, 8, 2, 2, 8, 8, 2, 2,
-							15, 15, 6, 8, 2, 8, 15, 15,
-							2, 8, 2, 2, 2, 15, 15, 6,
-							6, 2, 6, 8, 15, 15, 2, 2,
-							15, 15, 15, 15, 15, 2, 2, 15
-							],
-					"1/3":[0]*64,
-					"2/3":[
-							3, 3, 15, 15, 8, 3, 15, 15,
-							8, 8, 6, 6, 6, 5, 3, 3,
-							3, 3, 8, 15, 3, 3, 6, 10,
-							5, 8, 8, 6, 8, 5, 15, 15,
-							8, 15, 3, 5, 6, 10, 8, 15,
-							15, 3, 15, 5, 15, 15, 15, 15,
-							3, 15, 5, 5, 5, 8, 5, 10,
-							5, 10, 8, 13, 15, 12, 3, 3
-							],
-					"3/3":[
-							15, 8, 8, 3, 15, 15, 3, 8,
-							15, 15, 15, 15, 15, 15, 15, 8,
-							15, 8, 15, 3, 15, 8, 15, 8,
-							3, 15, 6, 10, 15, 15, 10, 8,
-							15, 3, 15, 10, 10, 8, 9, 10,
-							6, 15, 8, 15, 3, 6, 6, 8,
-							15, 3, 15, 15, 15, 15, 15, 15,
-							15, 15, 15, 15, 3, 15, 15, 8
-							],
-					}
+def texture_decode_options(blueBC5,imgDepth,threadCount,maxSize=0,mipCount=1,layerCount=1):
+	options = MonadoForgeTextureDecodeOptions()
+	options.setBlueBC5(blueBC5)
+	options.setDepth(imgDepth)
+	options.setThreadCount(threadCount)
+	options.setMaxSize(maxSize)
+	options.setMipCount(mipCount)
+	options.setLayerCount(layerCount)
+	return options
+
+# which of several jobs (indexes, in order) making the same image is the one actually worth doing: normally the last, e.g. the high-res version of something that also comes in low-res
+# but with a maxSize, it's whichever needs the least decoding to get the biggest image that still fits, since a high-res version would only get shrunk down to the same thing anyway
+def final_texture_job(textureJobs,jobIndexes,maxSize=0):
+	if maxSize <= 0:
+		return jobIndexes[-1]
+	def job_cost(j): # biggest result first, then least decoding, then latest
+		textureName,imgType,imgWidth,imgHeight,rawData,dechannelise,imgDepth,mipCount,layerCount = textureJobs[j]
+		mipLevel = chosen_mip_level(imgWidth,imgHeight,texture_decode_options(False,imgDepth,1,maxSize,mipCount,layerCount))
+		mipWidth,mipHeight = max(imgWidth >> mipLevel,1),max(imgHeight >> mipLevel,1)
+		finalWidth,finalHeight = capped_size(mipWidth,mipHeight,maxSize)
+		return [-finalWidth*finalHeight,mipWidth*mipHeight,-j]
+	return min(jobIndexes,key=job_cost)
 
 # much of this is just grabbed from XBC2MD, but only after understanding it (rather than blindly copy-pasting anything)
-# REMINDER: don't manipulate image.pixels directly/individually or things will be dummy slow https://blender.stackexchange.com/questions/3673/
-# references:
-# 	https://www.vg-resource.com/thread-31389.html
-# 	https://www.vg-resource.com/thread-33929.html
-# 	https://en.wikipedia.org/wiki/Z-order_curve
-# 	https://github.com/ScanMountGoat/tegra_swizzle
-# 	https://learn.microsoft.com/en-us/windows/win32/direct3d10/d3d10-graphics-programming-guide-resources-block-compression
-# 	https://learn.microsoft.com/en-us/windows/win32/direct3d11/bc7-format
-# 	https://github.com/python-pillow/Pillow/blob/main/src/libImaging/BcnDecode.c
-# 	https://registry.khronos.org/DataFormat/specs/1.3/dataformat.1.3.html#bptc_bc7
-def parse_texture(textureName,imgVersion,imgType,imgWidth,imgHeight,rawData,blueBC5,printProgress,overwrite=True,saveTo=None,dechannelise=False):
-	try:
-		imgFormat,bitsPerPixel = imageFormats[imgType]
-	except KeyError:
+# the decoding itself is in texture_funcs, this is just the Blender side of things
+def parse_texture(textureName,imgVersion,imgType,imgWidth,imgHeight,rawData,blueBC5,printProgress,overwrite=True,saveTo=None,dechannelise=False,imgDepth=1,threadCount=0,maxSize=0,mipCount=1,layerCount=1):
+	if imgType not in imageFormats:
 		print_error(textureName+" is of an unknown/unsupported image type (id "+str(imgType)+")")
 		return
+	if threadCount <= 0:
+		threadCount = os.cpu_count() or 1
+	if printProgress:
+		print_progress_bar(0,1,textureName)
+	options = texture_decode_options(blueBC5,imgDepth,threadCount,maxSize,mipCount,layerCount)
+	decoded = decode_texture_to_pngs(imgType,imgWidth,imgHeight,rawData,options,dechannelise,keepPixels=False)
+	if printProgress:
+		print_progress_bar(1,1,textureName)
+	return create_texture_images(textureName,decoded,overwrite=overwrite,saveTo=saveTo,dechannelise=dechannelise,imgDepth=chosen_mip_depth(imgWidth,imgHeight,options),layerCount=layerCount)
+
+# same as parse_texture, but for a whole list of textures at once, decoded (and encoded to PNG) in worker processes (only the image creation has to be done here, since bpy is main-thread-only)
+# each job is [textureName,imgType,imgWidth,imgHeight,rawData,dechannelise,imgDepth,mipCount,layerCount]
+# workerCount is the core budget: there's one process per core (up to the number of textures), and big textures are only split into bands between threads when there are cores to spare (see texture_band_threads)
+# if cachePath is given, decoded textures are kept there (up to cacheMaxBytes) and reused next time the exact same data comes along
+# if reuseSaved is set, textures saved to saveTo get a .hash file next to them, and next time the same data comes along, the saved file is just loaded instead
+# if progressive is set, when several jobs make the same image, only the first (lowest-res) one is done now and the last one is done in the background, swapping its pixels in when it's ready
+# if maxSize is given, anything bigger than that gets shrunk down to fit (using one of the texture's own mips where there's one small enough), and of several jobs making the same image, only the cheapest one that reaches that size gets decoded (see final_texture_job)
+# if shareIdentical is set, jobs with exactly the same data (and settings) as an image already made this session (or earlier in this list) just use that image, whatever they're called
+# returns the final image names in job order (None for any that couldn't be imported)
+def parse_textures(textureJobs,blueBC5,printProgress,workerCount=0,overwrite=True,saveTo=None,cachePath=None,cacheMaxBytes=0,reuseSaved=False,progressive=False,maxSize=0,shareIdentical=False):
+	finalNames = [None]*len(textureJobs)
+	remaining = [] # indexes of jobs that still need doing
+	for j,job in enumerate(textureJobs):
+		textureName,imgType = job[0:2]
+		if imgType not in imageFormats:
+			print_error(textureName+" is of an unknown/unsupported image type (id "+str(imgType)+")")
+		else:
+			remaining.append(j)
+	# when overwriting, only one job per name is worth doing (see final_texture_job), since the others would just get replaced (e.g. a low-res version of something that has a high-res one)
+	# unless it's progressive, in which case the first one is worth doing as a stand-in
+	upgrades = {} # job index : index of the job that replaces it in the background
+	if overwrite:
+		jobsByName = {}
+		for j in remaining:
+			jobsByName.setdefault(textureJobs[j][0],[]).append(j)
+		finalJobs = {n:final_texture_job(textureJobs,jobIndexes,maxSize) for n,jobIndexes in jobsByName.items()}
+		if progressive:
+			upgrades = {jobIndexes[0]:finalJobs[n] for n,jobIndexes in jobsByName.items() if jobIndexes[0] != finalJobs[n]}
+		remaining = [j for j in remaining if j == finalJobs[textureJobs[j][0]] or j in upgrades]
+	if workerCount <= 0:
+		workerCount = os.cpu_count() or 1
+	jobOptions = [texture_decode_options(blueBC5,job[6],1,maxSize,job[7],job[8]) for job in textureJobs]
+	dataKeys = {} # job index : hash of the data, for the ones that need it
+	if cachePath or (saveTo and reuseSaved) or shareIdentical:
+		for j in remaining:
+			textureName,imgType,imgWidth,imgHeight,rawData,dechannelise,imgDepth,mipCount,layerCount = textureJobs[j]
+			dataKeys[j] = decoded_texture_cache_key(imgType,imgWidth,imgHeight,rawData,jobOptions[j])
+	# identical jobs within the list only need doing once (stand-ins and upgrades are left alone, they're tied to their own names)
+	sharedJobs = {} # job index : index of the identical job that does the work
+	if shareIdentical:
+		firstByKey = {}
+		for j in remaining:
+			if j in upgrades.keys() or j in upgrades.values():
+				continue
+			sharingKey = (dataKeys[j],textureJobs[j][5])
+			if sharingKey in firstByKey:
+				sharedJobs[j] = firstByKey[sharingKey]
+			else:
+				firstByKey[sharingKey] = j
+		remaining = [j for j in remaining if j not in sharedJobs.keys()]
+	def decode_args(j,threadCount=1): # for decode_texture_to_pngs_cached, which does any cache loading/saving itself
+		textureName,imgType,imgWidth,imgHeight,rawData,dechannelise,imgDepth,mipCount,layerCount = textureJobs[j]
+		jobOptions[j].setThreadCount(threadCount)
+		return [imgType,imgWidth,imgHeight,rawData,jobOptions[j],dechannelise,cachePath,dataKeys.get(j),cacheMaxBytes]
+	def finish_job(j,decoded,existingImage=None):
+		textureName,imgType,imgWidth,imgHeight,rawData,dechannelise,imgDepth,mipCount,layerCount = textureJobs[j]
+		pixels,unassignedCount,blockCount,mode8Count,pngs = decoded
+		decodedDepth = chosen_mip_depth(imgWidth,imgHeight,jobOptions[j]) # a smaller mip of a 3D texture has fewer slices
+		if existingImage:
+			upgrade_texture_images(existingImage,textureName,decoded,overwrite=overwrite,saveTo=saveTo,dechannelise=dechannelise,imgDepth=decodedDepth,layerCount=layerCount)
+			finalNames[j] = existingImage.name
+		else:
+			finalNames[j] = create_texture_images(textureName,decoded,overwrite=overwrite,saveTo=saveTo,dechannelise=dechannelise,imgDepth=decodedDepth,layerCount=layerCount)
+		if shareIdentical:
+			register_shared_texture(finalNames[j],dataKeys[j],dechannelise)
+		if saveTo and reuseSaved: # only once the images themselves are definitely there
+			imageNames = [textureName]+([textureName+"_"+c for c in ["r","g","b","a"]] if dechannelise else [])
+			extension = image_file_extension(pngs[0])
+			queue_texture_write(os.path.join(saveTo,textureName+".hash"),dataKeys[j].encode(),after=[os.path.join(saveTo,n+extension) for n in imageNames])
+	def reuse_job(j): # for when there's no need to decode it, returns whether it worked out
+		textureName,imgType,imgWidth,imgHeight,rawData,dechannelise,imgDepth,mipCount,layerCount = textureJobs[j]
+		if shareIdentical:
+			finalNames[j] = find_shared_texture(dataKeys[j],dechannelise)
+			if finalNames[j]:
+				return True
+		if saveTo and reuseSaved:
+			finalNames[j] = load_saved_texture(textureName,saveTo,dechannelise,dataKeys[j],overwrite,texture_file_extension(imgType))
+			if finalNames[j]:
+				if shareIdentical:
+					register_shared_texture(finalNames[j],dataKeys[j],dechannelise)
+				return True
+		return False # (cache hits still go to the workers, since they need encoding)
+	# if the final version is already to hand (or only needs encoding from the cache), there's no need to bother with the stand-in
+	for first,last in list(upgrades.items()):
+		if reuse_job(last):
+			remaining.remove(last)
+		elif not (cachePath and has_cached_texture(cachePath,dataKeys[last],textureJobs[last][5])):
+			continue
+		remaining.remove(first)
+		del upgrades[first]
+	backgroundJobs = [j for j in remaining if j in upgrades.values()]
+	remaining = [j for j in remaining if j not in upgrades.values()]
+	doneCount = 0
+	totalCount = len(remaining)
+	if printProgress and remaining:
+		print_progress_bar(0,totalCount,"Textures")
+	def job_done():
+		nonlocal doneCount
+		doneCount += 1
+		if printProgress:
+			print_progress_bar(doneCount,totalCount,"Textures")
+	for j in remaining[:]:
+		if reuse_job(j):
+			remaining.remove(j)
+			job_done()
+	processCount = min(workerCount,len(remaining)) # no point starting more than there are textures
+	if processCount > 1:
+		pool = start_texture_pool(processCount)
+		try:
+			futures = [pool.submit(decode_texture_to_pngs_cached,*decode_args(j,texture_band_threads(workerCount,processCount))) for j in remaining]
+			for future in futures:
+				try:
+					decoded = future.result()
+				except (concurrent.futures.BrokenExecutor,OSError) as e: # e.g. the workers couldn't start or import the addon
+					print_warning("Couldn't decode textures in parallel ("+str(e)+"), doing the rest one at a time")
+					break
+				finish_job(remaining.pop(0),decoded)
+				job_done()
+		finally:
+			pool.shutdown(cancel_futures=True)
+	for j in remaining:
+		textureName,imgType,imgWidth,imgHeight,rawData,dechannelise,imgDepth,mipCount,layerCount = textureJobs[j]
+		finish_job(j,decode_texture_to_pngs_cached(*decode_args(j,workerCount))) # one at a time, so it gets every core
+		job_done()
 	
-	# first, check to see if image of the intended name exists already, and how to proceed
-	try:
-		existingImage = bpy.data.images[textureName]
-		if overwrite:
-			bpy.data.images.remove(existingImage)
-	except KeyError as e: # no existing image of the same name
-		pass # fine, move on
-	newImage = bpy.data.images.new(textureName,imgWidth,imgHeight,alpha=True)
-	# don't really want to do any of this until the end, but apparently setting the filepath after setting the pixels clears the image for no good reason
-	newImage.file_format = "PNG"
-	if saveTo:
-		newImage.filepath = os.path.join(saveTo,textureName+".png")
-	
-	blockSize = 4 # in pixels
-	unswizzleBufferSize = bitsPerPixel*2 # needs a better name at some point
-	if imgFormat == "R8G8B8A8_UNORM": # blocks are single pixels rather than 4x4
-		blockSize = 1
-		unswizzleBufferSize = bitsPerPixel // 8
-	# since the minimum block size is 4, images must be divisible by 4 - extend them as necessary
-	virtImgWidth = imgWidth if imgWidth % blockSize == 0 else imgWidth + (blockSize - (imgWidth % blockSize))
-	virtImgHeight = imgHeight if imgHeight % blockSize == 0 else imgHeight + (blockSize - (imgHeight % blockSize))
-	# gotta create the image in full emptiness to start with, so we can random-access-fill the blocks as they come
-	# Blender always needs alpha, so colours must be length 4
-	pixels = numpy.zeros([virtImgHeight*virtImgWidth,4],dtype=numpy.float32)
-	
-	blockCountX = virtImgWidth // blockSize
-	blockCountY = virtImgHeight // blockSize
-	blockCount = blockCountX*blockCountY
-	tileWidth = clamp(16 // unswizzleBufferSize, 1, 16)
-	tileCountX = ceildiv(blockCountX,tileWidth)
-	tileCountY = blockCountY # since tile height is always 1
-	tileCount = tileCountX*tileCountY
-	# essentially, how many unswizzled "rows" must we read to get a full "column" (in tiles)
-	# this controls how wide the column chunk must be
-	# not currently used (dunno if it later needs to be)
-	columnStackSize = clamp(blockCountY // 8, 1, 16)
-	
-	d = io.BytesIO(rawData)
-	#print(imgFormat)
+	for j,sharedJob in sharedJobs.items():
+		finalNames[j] = finalNames[sharedJob]
 	
-	try:
-		swizzlist = swizzleMapCache[f"{tileCountY},{tileCountX}"]
-	except KeyError:
-		swizzleTileMap = numpy.full([tileCountY,tileCountX],-1,dtype=int)
-		# swizzle pattern: (may need to change as larger images are discovered, but should be correct for smaller ones)
-		# x = 10001111111000010010
-		# y = 01110000000111101101
-		# [x9, y9, y8, y7, x8, x7, x6, x5, x4, x3, x2, y6, y5, y4, y3, x1, y2, y1, x0, y0]
-		# the distinction between z and currentTile is so we can draw the z-curve out of bounds while keeping all valid values in-bounds
-		currentTile = 0
-		z = -1 # will be incremented to 0 shortly
-		while currentTile < tileCountY*tileCountX:
-			if z > 10000000:
-				print_error("Bad z-loop detected in image "+textureName+": z = "+str(z)+"; currentTile = "+str(currentTile))
-				break
-			z += 1
-			y = ((z&0x70000)>>9) | ((z&0x1E0)>>2) | ((z&0xC)>>1) | (z&0x1)
-			if y >= len(swizzleTileMap): continue
-			x = ((z&0x80000)>>10) | ((z&0xFE00)>>7) | ((z&0x10)>>3) | ((z&0x2)>>1)
-			if x >= len(swizzleTileMap[y]): continue
-			swizzleTileMap[y,x] = currentTile
-			currentTile += 1
-		swizzlist = swizzleTileMap.flatten().tolist()
-		swizzleMapCache[f"{tileCountY},{tileCountX}"] = swizzlist
-		#print(swizzlist)
-	#swizzlist = range(blockCountX*blockCountY) # no-op option for debugging
-	monochrome = True
-	unassignedCount = False
-	bc7Mode8Flag = False
-	for t in range(tileCount):
-		if swizzlist[t] == -1:
-			unassignedCount += 1
-			continue
-		if printProgress and t % 64 == 0: # printing for every single t racks up the import time a lot (e.g. 12s to 20s)
-			print_progress_bar(t,tileCount,textureName)
-		d.seek(swizzlist[t]*(unswizzleBufferSize*tileWidth))
-		for t2 in range(tileWidth):
-			targetTile = t
-			targetBlock = t*tileWidth + t2
-			if targetBlock >= blockCount: continue # can happen for tiny textures, not a problem
-			targetBlockX = targetBlock % blockCountX
-			targetBlockY = targetBlock // blockCountX
-			# convert block to pixel (Y is inverted, X is not)
-			blockRootPixelX = targetBlockX*blockSize
-			blockRootPixelY = virtImgHeight - targetBlockY*blockSize - blockSize
-			if imgFormat == "R8G8B8A8_UNORM":
-				r = readAndParseInt(d,1)
-				g = readAndParseInt(d,1)
-				b = readAndParseInt(d,1)
-				a = readAndParseInt(d,1)
-				pixels[blockRootPixelX+blockRootPixelY*virtImgWidth] = [r/255.0,g/255.0,b/255.0,a/255.0]
-			elif imgFormat == "BC1_UNORM" or imgFormat == "BC3_UNORM": # easy enough to treat these the same
-				if imgFormat == "BC3_UNORM":
-					a0 = readAndParseInt(d,1)
-					a1 = readAndParseInt(d,1)
-					alphas = [a0,a1]
-					if a0 > a1:
-						for a in range(6):
-							alphas.append(((6-a)*a0+(a+1)*a1)/7.0)
-					else:
-						for a in range(4):
-							alphas.append(((4-a)*a0+(a+1)*a1)/5.0)
-						alphas.append(0.0)
-						alphas.append(255.0)
-					alphaIndexes0 = int.from_bytes(d.read(3),"little") # can't use readAndParseInt for these since 3 is a weird size
-					alphaIndexes1 = int.from_bytes(d.read(3),"little")
-					alphaIndexesTemp = []
-					for a in range(8):
-						alphaIndexesTemp.append((alphaIndexes0 & (0b111 << a*3)) >> a*3)
-					for a in range(8):
-						alphaIndexesTemp.append((alphaIndexes1 & (0b111 << a*3)) >> a*3)
-					alphaIndexes = [alphaIndexesTemp[i] for i in [12,13,14,15,8,9,10,11,4,5,6,7,0,1,2,3]]
-				# BC1_UNORM doesn't have "separate" alpha - no "else" needed
-				endpoint0 = readAndParseInt(d,2)
-				endpoint1 = readAndParseInt(d,2)
-				row0 = readAndParseInt(d,1)
-				row1 = readAndParseInt(d,1)
-				row2 = readAndParseInt(d,1)
-				row3 = readAndParseInt(d,1)
-				r0,g0,b0 = ((endpoint0 & 0b1111100000000000) >> 11),((endpoint0 & 0b0000011111100000) >> 5),(endpoint0 & 0b0000000000011111)
-				r1,g1,b1 = ((endpoint1 & 0b1111100000000000) >> 11),((endpoint1 & 0b0000011111100000) >> 5),(endpoint1 & 0b0000000000011111)
-				# potential future feature: autodetect images that are supposed to be greyscale and only use the higher-resolution green channel
-				#if monochrome and not(r0 == b0 and r1 == b1 and abs(r0*2 - g0) <= 1 and abs(r1*2 - g1) <= 1):
-				#	monochrome = False
-				colours = [[],[],[],[]]
-				colours[0] = [r0/0b11111,g0/0b111111,b0/0b11111,1.0]
-				colours[1] = [r1/0b11111,g1/0b111111,b1/0b11111,1.0]
-				if imgFormat == "BC3_UNORM" or endpoint0 > endpoint1:
-					colours[2] = [2/3*colours[0][0]+1/3*colours[1][0],2/3*colours[0][1]+1/3*colours[1][1],2/3*colours[0][2]+1/3*colours[1][2],1.0]
-					colours[3] = [1/3*colours[0][0]+2/3*colours[1][0],1/3*colours[0][1]+2/3*colours[1][1],1/3*colours[0][2]+2/3*colours[1][2],1.0]
-				else: # BC1_UNORM and endpoint0 < endpoint1
-					colours[2] = [1/2*colours[0][0]+1/2*colours[1][0],1/2*colours[0][1]+1/2*colours[1][1],1/2*colours[0][2]+1/2*colours[1][2],1.0]
-					colours[3] = [0.0,0.0,0.0,0.0] # binary alpha
-				pixelIndexes = [
-								(row3 & 0b00000011), (row3 & 0b00001100) >> 2, (row3 & 0b00110000) >> 4, (row3 & 0b11000000) >> 6,
-								(row2 & 0b00000011), (row2 & 0b00001100) >> 2, (row2 & 0b00110000) >> 4, (row2 & 0b11000000) >> 6,
-								(row1 & 0b00000011), (row1 & 0b00001100) >> 2, (row1 & 0b00110000) >> 4, (row1 & 0b11000000) >> 6,
-								(row0 & 0b00000011), (row0 & 0b00001100) >> 2, (row0 & 0b00110000) >> 4, (row0 & 0b11000000) >> 6,
-								]
-				if imgFormat == "BC3_UNORM":
-					for p,pi in enumerate(pixelIndexes):
-						pixels[(blockRootPixelX + p % 4) + ((blockRootPixelY + p // 4) * virtImgWidth)] = colours[pi][0:3]+[alphas[alphaIndexes[p]]/255.0]
-				else: # BC1_UNORM
-					for p,pi in enumerate(pixelIndexes):
-						pixels[(blockRootPixelX + p % 4) + ((blockRootPixelY + p // 4) * virtImgWidth)] = colours[pi]
-			elif imgFormat == "BC4_UNORM" or imgFormat == "BC5_UNORM": # BC5 is just two BC4s stapled together
-				r0 = readAndParseInt(d,1)
-				r1 = readAndParseInt(d,1)
-				reds = [r0,r1]
-				if r0 > r1:
-					for r in range(6):
-						reds.append(((6-r)*r0+(r+1)*r1)/7.0)
-				else:
-					for r in range(4):
-						reds.append(((4-r)*r0+(r+1)*r1)/5.0)
-					reds.append(0.0)
-					reds.append(255.0)
-				redIndexes0 = int.from_bytes(d.read(3),"little") # can't use readAndParseInt for these since 3 is a weird size
-				redIndexes1 = int.from_bytes(d.read(3),"little")
-				redIndexes = []
-				for r in range(8):
-					redIndexes.append((redIndexes0 & (0b111 << r*3)) >> r*3)
-				for r in range(8):
-					redIndexes.append((redIndexes1 & (0b111 << r*3)) >> r*3)
-				if imgFormat == "BC4_UNORM":
-					pixelIndexes = [redIndexes[i] for i in [12,13,14,15,8,9,10,11,4,5,6,7,0,1,2,3]]
-					for p,pi in enumerate(pixelIndexes):
-						value = reds[pi]/255.0
-						colour = [value,value,value,1]
-						pixels[(blockRootPixelX + p % 4) + ((blockRootPixelY + p // 4) * virtImgWidth)] = colour
-				else: # is BC5_UNORM
-					g0 = readAndParseInt(d,1)
-					g1 = readAndParseInt(d,1)
-					greens = [g0,g1]
-					if g0 > g1:
-						for g in range(6):
-							greens.append(((6-g)*g0+(g+1)*g1)/7.0)
-					else:
-						for g in range(4):
-							greens.append(((4-g)*g0+(g+1)*g1)/5.0)
-						greens.append(0.0)
-						greens.append(255.0)
-					greenIndexes0 = int.from_bytes(d.read(3),"little")
-					greenIndexes1 = int.from_bytes(d.read(3),"little")
-					greenIndexes = []
-					for g in range(8):
-						greenIndexes.append((greenIndexes0 & (0b111 << g*3)) >> g*3)
-					for g in range(8):
-						greenIndexes.append((greenIndexes1 & (0b111 << g*3)) >> g*3)
-					pixelIndexes = [[redIndexes[i],greenIndexes[i]] for i in [12,13,14,15,8,9,10,11,4,5,6,7,0,1,2,3]]
-					for p,pi in enumerate(pixelIndexes):
-						if blueBC5: # calculate blue channel for normal mapping (length of [r,g,b] is 1.0)
-							r = (reds[pi[0]]-128)/128.0
-							g = (greens[pi[1]]-128)/128.0
-							try:
-								b = (math.sqrt(1-r**2-g**2))/2+0.5
-							except ValueError: # r**2-g**2 > 1, thus sqrt tries to operate on a negative
-								b = 0.5
+	# the upgrades' images are the ones their stand-ins made
+	upgradeImages = {}
+	for first,last in upgrades.items():
+		finalNames[last] = finalNames[first]
+		if finalNames[first]:
+			upgradeImages[last] = bpy.data.images[finalNames[first]]
+	# and every other job of the same name ends up as whichever image its final job made (which isn't necessarily the last job, with a maxSize)
+	if overwrite:
+		for n,jobIndexes in jobsByName.items():
+			for j in jobIndexes:
+				if finalNames[j] is None:
+					finalNames[j] = finalNames[finalJobs[n]]
+	if upgradeImages:
+		if printProgress:
+			print("Upgrading "+str(len(upgradeImages))+" texture(s) in the background")
+		upgradeProcessCount = min(workerCount,len(upgradeImages))
+		if upgradeProcessCount > 1:
+			pool = start_texture_pool(upgradeProcessCount)
+		else: # a single worker may as well be a thread, rather than starting up a whole process for it
+			pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+		pending = {pool.submit(decode_texture_to_pngs_cached,*decode_args(j,texture_band_threads(workerCount,upgradeProcessCount))):j for j in upgradeImages.keys()}
+		fallbackPool = None
+		retriedJobs = set()
+		def stop_upgrades():
+			if stop_upgrades in activeTextureUpgrades:
+				activeTextureUpgrades.remove(stop_upgrades)
+			pool.shutdown(wait=False,cancel_futures=True)
+			if fallbackPool:
+				fallbackPool.shutdown(wait=False,cancel_futures=True)
+		activeTextureUpgrades.append(stop_upgrades)
+		# bpy is main-thread-only, so a timer keeps checking in and swaps in whatever's ready
+		def check_upgrades():
+			nonlocal fallbackPool
+			keepChecking = False
+			try:
+				for future in [f for f in pending.keys() if f.done()]:
+					j = pending.pop(future)
+					try:
+						decoded = future.result()
+					except Exception as e:
+						if isinstance(e,(concurrent.futures.BrokenExecutor,OSError)) and upgradeProcessCount > 1 and j not in retriedJobs: # worker processes aren't working out, so do it with a thread instead
+							if not fallbackPool:
+								fallbackPool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+							retriedJobs.add(j)
+							pending[fallbackPool.submit(decode_texture_to_pngs_cached,*decode_args(j,workerCount))] = j
 						else:
-							b = 0
-						colour = [reds[pi[0]]/255.0,greens[pi[1]]/255.0,b,1]
-						pixels[(blockRootPixelX + p % 4) + ((blockRootPixelY + p // 4) * virtImgWidth)] = colour
-			elif imgFormat == "BC7_UNORM":
-				block = d.read(16)
-				bits = BitReader(block,reverse=True)
-				mode = 0
-				for i in range(8):
-					modeBit = bits.readbits(1)
-					if modeBit:
-						break
-					mode += 1
-				if mode >= 8: # reserved, ought to never happen but returning [0,0,0,0] is da rulez
-					bc7Mode8Flag = True
-					for p in range(16):
-						pixels[(blockRootPixelX + p % 4) + ((blockRootPixelY + p // 4) * virtImgWidth)] = [0,0,0,0]
+							print_error("Couldn't upgrade texture "+textureJobs[j][0]+" ("+str(e)+")")
+						continue
+					try:
+						image = upgradeImages[j]
+						image.name # throws if the image has been deleted in the meantime
+					except ReferenceError:
+						continue
+					try:
+						finish_job(j,decoded,existingImage=image)
+					except Exception as e:
+						print_error("Couldn't upgrade texture "+textureJobs[j][0]+" ("+str(e)+")")
+						continue
+					if printProgress:
+						pngWidth,pngHeight = image_file_size(decoded[4][0])
+						print("Upgraded "+textureJobs[j][0]+" to "+str(pngWidth)+"x"+str(pngHeight))
+				keepChecking = bool(pending)
+			finally:
+				if not keepChecking:
+					stop_upgrades()
+			return textureUpgradeCheckInterval if keepChecking else None # None stops the timer
+		bpy.app.timers.register(check_upgrades,first_interval=textureUpgradeCheckInterval)
+	return finalNames
+
+textureUpgradeCheckInterval = 0.5 # seconds
+# how to stop each lot of upgrades that's still going, since loading another file drops their timers (and would leave their workers running with nothing to collect the results)
+activeTextureUpgrades = []
+@bpy.app.handlers.persistent
+def stop_texture_upgrades(*args):
+	for stop_upgrades in activeTextureUpgrades[:]:
+		stop_upgrades()
+
+# bulk version of parse_textures for when only the files are wanted: no Blender images at all, the worker processes decode and write the PNGs themselves
+# jobLists is an iterable of lists of jobs (e.g. one list per file, so they only get read as they're needed), listCount is how many lists there are (for the progress bar)
+# when several jobs in the same list have the same name, only the last is extracted, and names already extracted from an earlier list are skipped
+# returns how many textures were extracted, and prints a summary of how fast it all went
+def extract_textures(jobLists,listCount,saveTo,blueBC5,printProgress,workerCount=0,maxSize=0):
+	if workerCount <= 0:
+		workerCount = os.cpu_count() or 1
+	startTime = time.time()
+	extractedNames = set()
+	extractedCount = 0
+	totalBytes = 0
+	totalPixels = 0
+	pending = [] # [future,textureName,args], oldest first
+	pool = start_texture_pool(workerCount) if workerCount > 1 else None
+	def stop_pool(e): # e.g. the workers couldn't start or import the addon
+		nonlocal pool
+		print_warning("Couldn't extract textures in parallel ("+str(e)+"), doing the rest one at a time")
+		pool.shutdown(wait=False)
+		pool = None
+	def finish_oldest():
+		nonlocal extractedCount,totalBytes,totalPixels
+		future,textureName,args = pending.pop(0)
+		try:
+			try:
+				unassignedCount,blockCount,mode8Count,pixelCount = future.result() if future else extract_texture(*args)
+			except concurrent.futures.BrokenExecutor as e: # anything the pool didn't get to gets done here instead
+				if pool:
+					stop_pool(e)
+				unassignedCount,blockCount,mode8Count,pixelCount = extract_texture(*args)
+		except OSError as e: # couldn't write it
+			print_error("Couldn't save texture "+textureName+" ("+str(e)+")")
+			return
+		imgType,imgWidth,imgHeight,rawData,options = args[0:5]
+		report_texture_problems(textureName,[None,unassignedCount,blockCount,mode8Count],chosen_mip_depth(imgWidth,imgHeight,options),options.getLayerCount())
+		extractedCount += 1
+		totalBytes += len(rawData)
+		totalPixels += pixelCount
+	try:
+		if printProgress:
+			print_progress_bar(0,listCount,"Files")
+		for i,textureJobs in enumerate(jobLists):
+			jobsByName = {}
+			for j,job in enumerate(textureJobs):
+				jobsByName.setdefault(job[0],[]).append(j)
+			finalJobs = {n:final_texture_job(textureJobs,jobIndexes,maxSize) for n,jobIndexes in jobsByName.items()}
+			for j,job in enumerate(textureJobs):
+				textureName,imgType,imgWidth,imgHeight,rawData,dechannelise,imgDepth,mipCount,layerCount = job
+				if finalJobs[textureName] != j or textureName in extractedNames:
 					continue
-				subsetCount,partitionBits,rotationBits,indexSelectionBits,colourBits,alphaBits,endpointPBits,sharedPBits,indexBits,index2Bits = bc7ModeData[mode]
-				partitionPattern = 0
-				if partitionBits > 0:
-					partitionPattern = bits.readbits(partitionBits)
-				rotationPattern = 0
-				if rotationBits > 0:
-					rotationPattern = bits.readbits(rotationBits)
-				indexSelectionPattern = 0
-				if indexSelectionBits > 0:
-					indexSelectionPattern = bits.readbits(indexSelectionBits)
-				partitionMap = [0]*16
-				if subsetCount == 2:
-					bitstring = format(bc7PartitionMaps[2][partitionPattern],"016b")
-					partitionMap = [int(x,2) for x in bitstring]
-				elif subsetCount == 3:
-					bitstring = format(bc7PartitionMaps[3][partitionPattern],"032b")
-					partitionMap = [int(bitstring[x*2:x*2+2],2) for x in range(16)]
-				# must be reversed because it's just safer to leave the copy-pasted map data as-is than to reverse it all manually
-				partitionMap.reverse()
-				endpointsR = []
-				endpointsG = []
-				endpointsB = []
-				endpointsA = []
-				endpointsP = []
-				subsetsP = []
-				colourIndexes = []
-				alphaIndexes = []
-				indexSizes = [indexBits,indexBits] # colour, alpha
-				# this copy-paste of all the fors is annoying but necessary because things must be read in order
-				subIter = range(subsetCount)
-				for s in subIter:
-					endpointsR.append([bits.readbits(colourBits),bits.readbits(colourBits)])
-				for s in subIter:
-					endpointsG.append([bits.readbits(colourBits),bits.readbits(colourBits)])
-				for s in subIter:
-					endpointsB.append([bits.readbits(colourBits),bits.readbits(colourBits)])
-				for s in subIter:
-					endpointsA.append([bits.readbits(alphaBits),bits.readbits(alphaBits)])
-				for s in subIter:
-					endpointsP.append([bits.readbits(endpointPBits),bits.readbits(endpointPBits)])
-				for s in subIter:
-					subsetsP.append(bits.readbits(sharedPBits))
-				for p in range(16):
-					subset = partitionMap[p]
-					anchorIndex = bc7AnchorIndexes[str(subset+1)+"/"+str(subsetCount)][partitionPattern]
-					indexSizeMod = 0
-					if p == anchorIndex:
-						indexSizeMod = -1
-					if indexSelectionPattern:
-						alphaIndexes.append(bits.readbits(indexBits+indexSizeMod))
-					else:
-						colourIndexes.append(bits.readbits(indexBits+indexSizeMod))
-				if index2Bits > 0:
-					for p in range(16):
-						subset = partitionMap[p]
-						anchorIndex = bc7AnchorIndexes[str(subset+1)+"/"+str(subsetCount)][partitionPattern]
-						indexSizeMod = 0
-						if p == anchorIndex:
-							indexSizeMod = -1
-						if indexSelectionPattern: # reminder: this is the reverse of the first
-							colourIndexes.append(bits.readbits(index2Bits+indexSizeMod))
-							indexSizes[0] = index2Bits
-						else:
-							alphaIndexes.append(bits.readbits(index2Bits+indexSizeMod))
-							indexSizes[1] = index2Bits
-				# reading done, now for endpoint interpolation
-				reds = []
-				greens = []
-				blues = []
-				alphas = []
-				for s in subIter:
-					ra = []
-					ga = []
-					ba = []
-					aa = []
-					for ep in [0,1]:
-						r = endpointsR[s][ep]
-						g = endpointsG[s][ep]
-						b = endpointsB[s][ep]
-						a = endpointsA[s][ep]
-						if endpointPBits > 0:
-							r = (r << 1) | endpointsP[s][ep]
-							g = (g << 1) | endpointsP[s][ep]
-							b = (b << 1) | endpointsP[s][ep]
-							if alphaBits > 0:
-								a = (a << 1) | endpointsP[s][ep]
-						if sharedPBits > 0:
-							r = (r << 1) | subsetsP[s]
-							g = (g << 1) | subsetsP[s]
-							b = (b << 1) | subsetsP[s]
-							if alphaBits > 0:
-								a = (a << 1) | subsetsP[s]
-						cb = colourBits+endpointPBits+sharedPBits
-						ab = alphaBits+endpointPBits+sharedPBits if alphaBits > 0 else 0
-						r = (r << (8 - cb)) | ((r << (8 - cb)) >> cb)
-						g = (g << (8 - cb)) | ((g << (8 - cb)) >> cb)
-						b = (b << (8 - cb)) | ((b << (8 - cb)) >> cb)
-						if alphaBits > 0:
-							a = (a << (8 - ab)) | ((a << (8 - ab)) >> ab)
-						ra.append(r)
-						ga.append(g)
-						ba.append(b)
-						if alphaBits > 0:
-							aa.append(a)
-						else:
-							aa.append(255)
-					cw = bc7Weights[indexSizes[0]]
-					aw = bc7Weights[indexSizes[1]]
-					reds.append([((64-w)*ra[0]+w*ra[1]+32) >> 6 for w in cw])
-					greens.append([((64-w)*ga[0]+w*ga[1]+32) >> 6 for w in cw])
-					blues.append([((64-w)*ba[0]+w*ba[1]+32) >> 6 for w in cw])
-					alphas.append([((64-w)*aa[0]+w*aa[1]+32) >> 6 for w in aw])
-				# and now finally actually setting the pixels
-				for p in range(16):
-					subset = partitionMap[p]
-					r = reds[subset][colourIndexes[p]]
-					g = greens[subset][colourIndexes[p]]
-					b = blues[subset][colourIndexes[p]]
-					if alphaIndexes:
-						a = alphas[subset][alphaIndexes[p]]
-					else:
-						a = 255
-					if rotationPattern == 1:
-						r,a = a,r
-					elif rotationPattern == 2:
-						g,a = a,g
-					elif rotationPattern == 3:
-						b,a = a,b
-					pi = [12,13,14,15,8,9,10,11,4,5,6,7,0,1,2,3][p]
-					pixels[(blockRootPixelX + pi % 4) + ((blockRootPixelY + pi // 4) * virtImgWidth)] = [r/255.0,g/255.0,b/255.0,a/255.0]
-	if printProgress:
-		print_progress_bar(tileCount,tileCount,textureName)
+				if imgType not in imageFormats:
+					print_error(textureName+" is of an unknown/unsupported image type (id "+str(imgType)+")")
+					continue
+				extractedNames.add(textureName)
+				# plenty of textures to go around, so each one gets a single thread
+				args = [imgType,imgWidth,imgHeight,rawData,texture_decode_options(blueBC5,imgDepth,1,maxSize,mipCount,layerCount),os.path.join(saveTo,textureName+texture_file_extension(imgType)),dechannelise]
+				future = None # no future means it gets done when it's finished off
+				if pool:
+					try:
+						future = pool.submit(extract_texture,*args)
+					except concurrent.futures.BrokenExecutor as e:
+						stop_pool(e)
+				pending.append([future,textureName,args])
+				while len(pending) > (workerCount*2 if pool else 0): # don't let finished data pile up in memory
+					finish_oldest()
+			if printProgress:
+				print_progress_bar(i+1,listCount,"Files")
+		while pending:
+			finish_oldest()
+	finally:
+		if pool:
+			pool.shutdown(cancel_futures=True)
+	elapsed = max(time.time()-startTime,0.001)
+	megabytes = totalBytes/(1024*1024)
+	megapixels = totalPixels/1000000
+	print("Extracted "+str(extractedCount)+" texture(s) in "+str(round(elapsed,1))+"s: "+str(round(megabytes,1))+" MB of texture data ("+str(round(megabytes/elapsed,1))+" MB/s), "+str(round(megapixels,1))+" megapixels ("+str(round(megapixels/elapsed,1))+" MP/s)")
+	return extractedCount
+
+# the DDS version of parse_textures: the blocks are just put back in order and saved as .dds files (mips and all) for Blender to load, with no decoding
+# jobs are the same as for parse_textures, and there's nowhere for the files to go without saveTo
+# when several jobs make the same image, the biggest one is used, with the others' levels after it as mips wherever they carry on where it left off (e.g. XC3's separate high-res files)
+# dechannelising isn't possible without decoding, so it's ignored; if maxSize is given, stored levels bigger than that are left out (but nothing smaller can be made), and so are jobs that only have levels that big
+# textures Blender can't load as a DDS (formats without an old-style header, and 3D textures/cube maps, which would only get their first slice/face) go through parse_textures instead, hence the rest of the arguments
+# returns the final image names in job order (None for any that couldn't be imported)
+def parse_textures_dds(textureJobs,saveTo,printProgress,overwrite=True,maxSize=0,blueBC5=False,workerCount=0,cachePath=None,cacheMaxBytes=0):
+	finalNames = [None]*len(textureJobs)
+	jobsByName = {}
+	decodedJobs = []
+	decodedReasons = {} # texture name : why it isn't a DDS
+	for j,job in enumerate(textureJobs):
+		textureName,imgType,imgWidth,imgHeight,rawData,dechannelise,imgDepth,mipCount,layerCount = job
+		if imgType not in imageFormats:
+			print_error(textureName+" is of an unknown/unsupported image type (id "+str(imgType)+")")
+		elif imageFormats[imgType][0] not in ddsFormats:
+			decodedJobs.append(j)
+			decodedReasons[textureName] = imageFormats[imgType][0]
+		elif imgDepth > 1 or layerCount > 1:
+			decodedJobs.append(j)
+			decodedReasons[textureName] = "3D" if imgDepth > 1 else "a cube map"
+		elif overwrite:
+			jobsByName.setdefault(textureName,[]).append(j)
+		else:
+			jobsByName[(textureName,j)] = [j]
+	if printProgress and jobsByName:
+		print_progress_bar(0,len(jobsByName),"Textures")
+	for i,jobIndexes in enumerate(jobsByName.values()):
+		textureName = textureJobs[jobIndexes[0]][0]
+		jobIndexes = sorted(jobIndexes,key=lambda j:textureJobs[j][2]*textureJobs[j][3],reverse=True)
+		usedJobs = jobIndexes
+		if maxSize > 0: # jobs with no level small enough aren't even deswizzled (unless there's nothing else, in which case the smallest has to do)
+			usedJobs = [j for j in jobIndexes if max(lbim_mip_levels(*textureJobs[j][1:4],*textureJobs[j][6:8])[-1][2:4]) <= maxSize] or jobIndexes[-1:]
+		levels = []
+		unassignedCount = 0
+		for j in usedJobs:
+			jobName,imgType,imgWidth,imgHeight,rawData,dechannelise,imgDepth,mipCount,layerCount = textureJobs[j]
+			if levels and (imgType != textureJobs[usedJobs[0]][1] or [imgWidth,imgHeight] != [max(levels[-1][1]//2,1),max(levels[-1][2]//2,1)]):
+				continue # doesn't carry on from the levels so far
+			jobLevels,jobUnassignedCount = deswizzle_mip_levels(imgType,imgWidth,imgHeight,rawData,imgDepth,mipCount)
+			levels += jobLevels
+			unassignedCount += jobUnassignedCount
+		if unassignedCount > 0:
+			print_error("Texture "+textureName+" didn't complete deswizzling correctly: "+str(unassignedCount)+" blocks unassigned")
+		while maxSize > 0 and len(levels) > 1 and max(levels[0][1:3]) > maxSize:
+			levels.pop(0)
+		newImage = create_saved_image(textureName,os.path.join(saveTo,textureName+".dds"),encode_dds(textureJobs[usedJobs[0]][1],levels),overwrite)
+		for j in jobIndexes:
+			finalNames[j] = newImage.name
+		if printProgress:
+			print_progress_bar(i+1,len(jobsByName),"Textures")
+	if decodedJobs:
+		for textureName,reason in decodedReasons.items():
+			print("Texture "+textureName+" is "+reason+", which Blender can't load as a DDS, so it's decoded instead")
+		decodedNames = parse_textures([textureJobs[j] for j in decodedJobs],blueBC5,printProgress,workerCount,overwrite=overwrite,saveTo=saveTo,cachePath=cachePath,cacheMaxBytes=cacheMaxBytes,maxSize=maxSize)
+		for j,decodedName in zip(decodedJobs,decodedNames):
+			finalNames[j] = decodedName
+	return finalNames
+
+# every image made (or loaded) this session, by the key of the data it was made from, so that identical textures from other models can use the same image
+# the key is also stored on the image itself, so an image that's since been deleted, renamed, or had its pixels swapped out doesn't get handed out by mistake
+sharedTextures = {} # [key,dechannelise] : image name
+sharedTextureKeyProperty = "monado_forge_data_key"
+def register_shared_texture(imageName,key,dechannelise):
+	image = bpy.data.images.get(imageName) if imageName else None
+	if image is None:
+		return
+	image[sharedTextureKeyProperty] = key
+	sharedTextures[(key,dechannelise)] = imageName
+	if dechannelise: # the splits come along too, so the same image also does for anyone who doesn't want them
+		sharedTextures[(key,False)] = imageName
+def find_shared_texture(key,dechannelise):
+	imageName = sharedTextures.get((key,dechannelise))
+	if imageName is None:
+		return None
+	image = bpy.data.images.get(imageName)
+	if image is None or image.get(sharedTextureKeyProperty) != key or (dechannelise and not all(imageName+"_"+c in bpy.data.images for c in ["r","g","b","a"])):
+		del sharedTextures[(key,dechannelise)]
+		return None
+	return imageName
+
+# how many band threads each texture gets when processCount processes are decoding at once: whatever's left of the core budget, so it never goes over one thread per core
+# (with every core already busy with its own texture, extra threads only add memory, not speed)
+def texture_band_threads(coreCount,processCount):
+	return max(1,coreCount // processCount)
+
+# spawn rather than fork, since forking all of Blender is asking for trouble
+def start_texture_pool(processCount):
+	return concurrent.futures.ProcessPoolExecutor(max_workers=processCount,mp_context=multiprocessing.get_context("spawn"))
+
+# loads a texture (and its splits, if wanted) that was saved by a previous import, but only if it was made from the data that key says it should be
+# extension is whatever texture_file_extension says for the texture's format
+# returns the final image name, or None if it needs doing over
+def load_saved_texture(textureName,saveTo,dechannelise,key,overwrite=True,extension=".png"):
+	try:
+		with open(os.path.join(saveTo,textureName+".hash"),"r") as f:
+			if f.read() != key:
+				return None
+	except OSError: # no hash, so no way of knowing what it was made from
+		return None
+	imageNames = [textureName]
+	if dechannelise:
+		imageNames += [textureName+"_"+c for c in ["r","g","b","a"]]
+	if not all(os.path.exists(os.path.join(saveTo,n+extension)) for n in imageNames):
+		return None
+	finalNames = []
+	for n in imageNames:
+		try:
+			existingImage = bpy.data.images[n]
+			if overwrite:
+				bpy.data.images.remove(existingImage)
+		except KeyError as e: # no existing image of the same name
+			pass # fine, move on
+		loadedImage = bpy.data.images.load(os.path.join(saveTo,n+extension))
+		loadedImage.name = n
+		finalNames.append(loadedImage.name)
+	return finalNames[0]
+
+# imgDepth is the depth of the level that was actually decoded (see chosen_mip_depth), not necessarily the texture's full depth
+def report_texture_problems(textureName,decoded,imgDepth=1,layerCount=1):
+	unassignedCount,blockCount,mode8Count = decoded[1:4]
 	if unassignedCount > 0:
-		print_error("Texture "+textureName+" didn't complete deswizzling correctly: "+str(unassignedCount)+" / "+str(tileCountY*tileCountX)+" tiles unassigned")
-	if bc7Mode8Flag:
-		print_warning("Texture "+textureName+" contained illegal BC7 blocks (rendered as transparent black)")
-	d.close()
-	
-	finalImages = [[newImage,pixels]]
+		print_error("Texture "+textureName+" didn't complete deswizzling correctly: "+str(unassignedCount)+" / "+str(blockCount)+" blocks unassigned")
+	if mode8Count > 0:
+		print_warning("Texture "+textureName+" contained illegal BC6H/BC7 blocks (rendered as opaque black for BC6H, transparent black for BC7)")
+	if imgDepth > 1:
+		print("Texture "+textureName+" is 3D ("+str(imgDepth)+" slices deep), imported as its slices stacked top to bottom")
+	if layerCount > 1:
+		print("Texture "+textureName+" has "+str(layerCount)+" layers (e.g. cube map faces), imported stacked top to bottom")
 
+# decoded is as from decode_texture_to_pngs, so the images are made straight from the PNGs, and Blender only actually reads the pixels once something wants them
+# (no float copy of the image on this side at all, and no saving through Blender either)
+def create_texture_images(textureName,decoded,overwrite=True,saveTo=None,dechannelise=False,imgDepth=1,layerCount=1):
+	report_texture_problems(textureName,decoded,imgDepth,layerCount)
+	pngs = decoded[4]
+	newImage = create_png_image(textureName,pngs[0],overwrite,saveTo)
 	if dechannelise:
-		for i,c in enumerate(["r","g","b","a"]):
-			splitName = textureName+"_"+c
-			try:
-				existingSplitImage = bpy.data.images[splitName]
-				if overwrite:
-					bpy.data.images.remove(existingSplitImage)
-			except KeyError as e: # no existing image of the same name
-				pass # fine, move on
-			newSplitImage = bpy.data.images.new(splitName,imgWidth,imgHeight)
-			# don't really want to do any of this until the end, but apparently setting the filepath after setting the pixels clears the image for no good reason
-			newSplitImage.file_format = "PNG"
-			if saveTo:
-				newSplitImage.filepath = os.path.join(saveTo,splitName+".png")
-
-			# Assign the selected single channel to the RGB channels.
-			splitPixels = numpy.zeros([virtImgHeight*virtImgWidth,4],dtype=numpy.float32)
-			splitPixels[:,0] = pixels[:,i]
-			splitPixels[:,1] = pixels[:,i]
-			splitPixels[:,2] = pixels[:,i]
-			splitPixels[:,3] = 1.0
-
-			finalImages.append([newSplitImage,splitPixels])
-
-	# final pixel data must be 1D (and, if necessary, cropped)
-	for fi,px in finalImages:
-		# Fast pixel updates using foreach_set: 
-		# https://projects.blender.org/blender/blender/commit/9075ec8269e7cb029f4fab6c1289eb2f1ae2858a
-		pixel_buffer = px.reshape([virtImgHeight,virtImgWidth,4])[0:imgHeight,0:imgWidth].reshape(-1)
-		fi.pixels.foreach_set(pixel_buffer)
-		fi.update()
-
-		if saveTo:
-			fi.save()
+		for c,pngData in zip(["r","g","b","a"],pngs[1:]):
+			create_png_image(textureName+"_"+c,pngData,overwrite,saveTo)
 	return newImage.name # pass back whatever the final name of the image ended up being
 
+# same as create_texture_images, but reuses an image that already exists (e.g. a low-res stand-in), so anything using it gets the new pixels
+def upgrade_texture_images(image,textureName,decoded,overwrite=True,saveTo=None,dechannelise=False,imgDepth=1,layerCount=1):
+	report_texture_problems(textureName,decoded,imgDepth,layerCount)
+	pngs = decoded[4]
+	if saveTo:
+		imageNames = [textureName]+([textureName+"_"+c for c in ["r","g","b","a"]] if dechannelise else [])
+		extension = image_file_extension(pngs[0])
+		imagePaths = [os.path.join(saveTo,n+extension) for n in imageNames]
+		writes = [queue_texture_write(imagePath,pngData) for imagePath,pngData in zip(imagePaths,pngs)]
+		# upgrades happen after the import is over, so there's no wait_for_texture_writes coming: the files have to be there before anything points at them
+		for imagePath,write in zip(imagePaths,writes):
+			try:
+				write.result()
+			except OSError as e:
+				print_error("Couldn't save texture "+imagePath+" ("+str(e)+")")
+		image.filepath = imagePaths[0]
+		image.reload()
+		for imageName,imagePath in zip(imageNames[1:],imagePaths[1:]):
+			create_file_image(imageName,imagePath,overwrite)
+	else:
+		image.pack(data=pngs[0],data_len=len(pngs[0]))
+		image.reload()
+		if dechannelise:
+			for c,pngData in zip(["r","g","b","a"],pngs[1:]):
+				create_png_image(textureName+"_"+c,pngData,overwrite)
+
+# saved if there's somewhere to save it, packed into the .blend otherwise (pngData can also be an EXR, for HDR textures)
+def create_png_image(imageName,pngData,overwrite=True,saveTo=None):
+	extension = image_file_extension(pngData)
+	if saveTo:
+		return create_saved_image(imageName,os.path.join(saveTo,imageName+extension),pngData,overwrite)
+	try:
+		existingImage = bpy.data.images[imageName]
+		if overwrite:
+			bpy.data.images.remove(existingImage)
+	except KeyError as e: # no existing image of the same name
+		pass # fine, move on
+	# nowhere to save it, so it gets packed into the .blend instead (made at 1x1, since the pixels come from the packed file anyway, see create_saved_image)
+	newImage = bpy.data.images.new(imageName,1,1,alpha=True,float_buffer=(extension == ".exr"))
+	newImage.pack(data=pngData,data_len=len(pngData))
+	newImage.source = "FILE"
+	newImage.name = imageName
+	return newImage
+
+# an image for a file that's only queued to be written, which works out since Blender doesn't read the file until something wants the pixels (see wait_for_texture_writes)
+def create_saved_image(imageName,imagePath,fileData,overwrite=True):
+	queue_texture_write(imagePath,fileData)
+	return create_file_image(imageName,imagePath,overwrite)
+# an image for a file that's already been written
+# the image is made at 1x1 and then pointed at the file, since images.new fills in a whole buffer of the size it's given (which would just be thrown away)
+def create_file_image(imageName,imagePath,overwrite=True):
+	try:
+		existingImage = bpy.data.images[imageName]
+		if overwrite:
+			bpy.data.images.remove(existingImage)
+	except KeyError as e: # no existing image of the same name
+		pass # fine, move on
+	newImage = bpy.data.images.new(imageName,1,1,alpha=True,float_buffer=imagePath.endswith(".exr")) # float images get a linear colour space
+	newImage.filepath = imagePath
+	newImage.source = "FILE"
+	newImage.name = imageName
+	return newImage
+
+# texture files are written by a few background threads (file writes let go of the GIL), so the disk work overlaps with the rest of the import
+# only so many writes can be waiting at once (anything more waits for room), so finished data can't pile up in memory
+# every file is written to a temporary file and renamed, so a half-written file never ends up where a finished one should be
+textureWriterCount = 4
+textureWriteQueueSize = 32
+textureWriterPool = None
+textureWriteSlots = threading.BoundedSemaphore(textureWriteQueueSize)
+textureWrites = {} # path : future, for every write since the last wait_for_texture_writes
+# after is a list of paths whose (queued) writes have to finish first
+def queue_texture_write(path,data,after=[]):
+	global textureWriterPool
+	if textureWriterPool is None:
+		textureWriterPool = concurrent.futures.ThreadPoolExecutor(max_workers=textureWriterCount)
+	earlierWrites = [textureWrites[p] for p in after if p in textureWrites]
+	def write():
+		try:
+			for earlierWrite in earlierWrites: # these were queued first, so a writer has already taken them (no chance of them waiting on this)
+				earlierWrite.result()
+			write_file_atomically(path,data)
+		finally:
+			textureWriteSlots.release()
+	textureWriteSlots.acquire()
+	textureWrites[path] = textureWriterPool.submit(write)
+	return textureWrites[path]
+# the completion barrier: once this returns, every queued texture file is on disk (or has been reported as failed)
+def wait_for_texture_writes():
+	for path,future in list(textureWrites.items()):
+		try:
+			future.result()
+		except OSError as e:
+			print_error("Couldn't save texture "+path+" ("+str(e)+")")
+	textureWrites.clear()
+
 def register():
-	pass
+	bpy.app.handlers.load_pre.append(stop_texture_upgrades)
 
 def unregister():
-	pass
+	stop_texture_upgrades()
+	if stop_texture_upgrades in bpy.app.handlers.load_pre:
+		bpy.app.handlers.load_pre.remove(stop_texture_upgrades)
 
 #[...]
\ No newline at end of file